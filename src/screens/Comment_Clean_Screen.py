@@ -3,14 +3,16 @@ import logging
 import threading
 import time
 import collections
+from bisect import insort
 
 from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QSplitter, QPushButton, QLabel, QCheckBox,
     QScrollArea, QLineEdit, QSpinBox, QMessageBox,
-    QProgressBar, QStackedWidget, QTextEdit, QTableWidgetItem, QAbstractItemView, QTableWidget, QHeaderView, QFrame
+    QProgressBar, QStackedWidget, QTextEdit, QAbstractItemView, QHeaderView, QFrame,
+    QTableView
 )
-from PyQt6.QtCore import Qt, pyqtSignal, QThread, pyqtSlot, QUrl, QTimer,QObject
+from PyQt6.QtCore import Qt, pyqtSignal, QThread, pyqtSlot, QUrl, QTimer,QObject, QAbstractTableModel, QModelIndex
 from PyQt6.QtGui import QDesktopServices
 from typing import Optional, Dict, Callable, List, Union
 
@@ -22,8 +24,9 @@ except ImportError:
 
 from ..types import Screen, Comment, Danmu, Notify, FetchProgressState, ActivityInfo
 from ..api.api_service import ApiService
-from ..api.notify import fetch as fetch_data
-from ..utils import fuzzy_search, ClickTracker
+from ..api.notify import fetch as fetch_data, remove_notify
+from ..api.comment import remove_comment
+from ..utils import fuzzy_filter, normalize_for_search, ClickTracker
 
 from ..database.models import CommentRecord, DanmuRecord, NotifyRecord
 
@@ -31,6 +34,35 @@ from ..database.models import CommentRecord, DanmuRecord, NotifyRecord
 
 logger = logging.getLogger(__name__)
 
+# 各类型对应的删除接口（弹幕没有删除接口）
+_REMOVERS = {
+    "评论": remove_comment, "通知": remove_notify,
+    "comment": remove_comment, "notify": remove_notify,
+}
+
+def _shutdown_loop(loop: asyncio.AbstractEventLoop, name: str):
+    """关闭线程私有的事件循环：取消剩余任务并等待其结束（最多2秒），关闭异步生成器后再关闭循环"""
+    try:
+        pending = [task for task in asyncio.all_tasks(loop) if not task.done()]
+        for task in pending:
+            task.cancel()
+        if pending:
+            done, still_pending = loop.run_until_complete(asyncio.wait(pending, timeout=2.0))
+            for task in done:
+                if not task.cancelled():
+                    task.exception()  # 取走异常，避免 "exception was never retrieved" 警告
+            if still_pending:
+                logger.warning(f"{len(still_pending)} {name} tasks didn't cancel in time")
+        loop.run_until_complete(loop.shutdown_asyncgens())
+    except Exception as e:
+        logger.error(f"Error cancelling {name} tasks: {e}")
+    finally:
+        try:
+            if not loop.is_closed():
+                loop.close()
+        except Exception as e:
+            logger.error(f"Error closing {name} event loop: {e}")
+
 class LogHandler(logging.Handler, QObject):
     """自定义日志处理器，用于将日志发送到UI"""
     log_signal = pyqtSignal(str)
@@ -53,12 +85,12 @@ class LogHandler(logging.Handler, QObject):
         self.logs.append(msg)
         self.log_signal.emit(msg)
 class FetchThread(QThread):
-    """用于获取数据的线程"""
+    """用于获取数据的线程
+
+    进度不逐条发信号，只记录最新状态，由界面定时调用 take_updates() 取走
+    """
     finished = pyqtSignal(object)
     error = pyqtSignal(str)
-    status_update = pyqtSignal(str)
-    # 活动信息更新信号
-    activity_update = pyqtSignal(object)  # ActivityInfo对象
 
     def __init__(self, api_service, aicu_state, progress_state):
         super().__init__()
@@ -67,6 +99,17 @@ class FetchThread(QThread):
         self.progress_state = progress_state
         self._is_running = True
         self._stop_flag = threading.Event()
+        self._latest_status: Optional[str] = None
+        self._pending_activity: Dict[str, ActivityInfo] = {}  # 每个分类只保留最新一条
+        # 工作线程写入、界面线程取走，两边都在锁内进行，避免界面遍历时字典被写入
+        self._updates_lock = threading.Lock()
+
+    def take_updates(self) -> tuple:
+        """取走自上次调用以来的最新状态文本和各分类活动信息"""
+        with self._updates_lock:
+            status, self._latest_status = self._latest_status, None
+            pending, self._pending_activity = self._pending_activity, {}
+        return status, pending
 
     def stop(self):
         """停止线程"""
@@ -82,13 +125,15 @@ class FetchThread(QThread):
         def progress_callback(message_or_info: Union[str, ActivityInfo]):
             if self._is_running:
                 if isinstance(message_or_info, ActivityInfo):
-                    # 发送活动信息
-                    self.activity_update.emit(message_or_info)
-                    # 同时发送简化的状态文本
-                    self.status_update.emit(str(message_or_info))
+                    # 记录活动信息，同时记录简化的状态文本
+                    status = str(message_or_info)
+                    with self._updates_lock:
+                        self._pending_activity[message_or_info.category] = message_or_info
+                        self._latest_status = status
                 else:
                     # 保持向后兼容性，处理字符串消息
-                    self.status_update.emit(message_or_info)
+                    with self._updates_lock:
+                        self._latest_status = message_or_info
 
         try:
             result = loop.run_until_complete(self._fetch_with_session(progress_callback))
@@ -99,34 +144,7 @@ class FetchThread(QThread):
             if self._is_running:
                 self.error.emit(str(e))
         finally:
-            try:
-                # 更强力的清理所有挂起的任务
-                tasks = asyncio.all_tasks(loop=loop)
-                for task in tasks:
-                    if not task.done():
-                        task.cancel()
-                if tasks:
-                    try:
-                        loop.run_until_complete(
-                            asyncio.wait_for(
-                                asyncio.gather(*tasks, return_exceptions=True),
-                                timeout=2.0  # 2秒超时
-                            )
-                        )
-                    except asyncio.TimeoutError:
-                        logger.warning("Some tasks didn't cancel in time")
-                    except Exception as e:
-                        logger.error(f"Error during task cancellation: {e}")
-            except Exception as e:
-                logger.error(f"Error cancelling tasks: {e}")
-            finally:
-                try:
-                    if not loop.is_closed():
-                        loop.close()
-                except Exception as e:
-                    logger.error(f"Error closing event loop: {e}")
-
-
+            _shutdown_loop(loop, "fetch")
 
     async def _fetch_with_session(self, progress_callback: Callable[[Union[str, ActivityInfo]], None]):
         if not self._is_running:
@@ -156,71 +174,254 @@ class FetchThread(QThread):
             except Exception as e:
                 logger.debug(f"Error closing temp api_service: {e}")
 
-class DeleteThread(QThread):
+class AsyncTask(QObject):
+    """在主线程的 qasync 事件循环上运行的异步任务，接口与 QThread 保持一致（start/stop/isRunning/wait）
+
+    子类实现协程方法 _run()，由 start() 调度到事件循环上
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._task: Optional[asyncio.Task] = None
+        self._is_running = True
+
+    def start(self):
+        self._task = asyncio.ensure_future(self._run())
+
+    def stop(self): self._is_running = False
+
+    def cancel(self):
+        """立即取消任务（窗口关闭时使用）"""
+        self._is_running = False
+        if self._task and not self._task.done():
+            self._task.cancel()
+
+    def isRunning(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def wait(self, msecs: int = 0) -> bool:
+        """任务运行在主线程事件循环中，不能阻塞等待；返回任务是否已结束"""
+        return not self.isRunning()
+
+
+class DeleteTask(AsyncTask):
     item_deleted = pyqtSignal(int)
     finished = pyqtSignal()
     error = pyqtSignal(str)
     progress = pyqtSignal(int, int)
 
-    def __init__(self, api_service, items, item_type, sleep_seconds, delete_db=False, db_manager=None, uid=None):
+    def __init__(self, api_service, items, item_type, sleep_seconds, delete_db=False, db_manager=None, uid=None,
+                 concurrency=4):
         super().__init__()
         self.api_service, self.items, self.item_type, self.sleep_seconds = api_service, items, item_type, sleep_seconds
         self.delete_db = delete_db
         self.db_manager = db_manager
         self.uid = uid
-        self._is_running = True
-
-    def stop(self): self._is_running = False
+        self.concurrency = max(1, concurrency)  # 每批并发删除的数量
 
-    def run(self):
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try: loop.run_until_complete(self._delete_items())
+    async def _run(self):
+        try: await self._delete_items()
+        except asyncio.CancelledError:
+            logger.info(f"[DeleteTask] {self.item_type} delete cancelled")
         except Exception as e:
             logger.error(f"Delete error: {e}")
             self.error.emit(str(e))
-        finally:
-            try: loop.close()
-            except: pass
 
     async def _delete_items(self):
+        """按批并发删除，每批最多 concurrency 个请求，批与批之间按删除间隔等待"""
         total, current = len(self.items), 0
-        for item_id, item in self.items:
+        for start in range(0, total, self.concurrency):
             if not self._is_running: break
-            current += 1
+            batch = self.items[start:start + self.concurrency]
+            await asyncio.gather(*(self._delete_one(item_id, item) for item_id, item in batch))
+            current += len(batch)
             self.progress.emit(current, total)
-            try:
-                if self.item_type == "评论":
-                    from ..api.comment import remove_comment
-                    await remove_comment(item, item_id, self.api_service)
-                elif self.item_type == "通知":
-                    from ..api.notify import remove_notify
-                    await remove_notify(item, item_id, self.api_service)
-
-                # API删除成功后，检查是否需要删除数据库记录
-                if self.delete_db and self.db_manager and self.uid:
-                    try:
-                        if self.item_type == "评论":
-                            self.db_manager.delete_comment_permanently(item_id, self.uid)
-                        elif self.item_type == "弹幕":
-                            self.db_manager.delete_danmu_permanently(item_id, self.uid)
-                        elif self.item_type == "通知":
-                            self.db_manager.delete_notify_permanently(item_id, self.uid)
-                        logger.info(f"数据库中的 {self.item_type} {item_id} 已永久删除")
-                    except Exception as e:
-                        logger.error(f"删除数据库记录失败: {e}")
-
-                self.item_deleted.emit(item_id)
-                logger.info(f"Deleted {self.item_type} {item_id}")
-            except Exception as e:
-                logger.error(f"Failed to delete {self.item_type} {item_id}: {e}")
-                self.error.emit(f"删除 {self.item_type} (ID: {item_id}) 失败: {e}")
             if self._is_running and current < total:
-                logger.info(f"[DeleteThread] sleep {self.sleep_seconds} seconds before next delete...")
-                print(f"[DeleteThread] sleep {self.sleep_seconds} seconds before next delete...")
+                logger.info(f"[DeleteTask] sleep {self.sleep_seconds} seconds before next delete...")
+                print(f"[DeleteTask] sleep {self.sleep_seconds} seconds before next delete...")
                 await asyncio.sleep(self.sleep_seconds)
         self.finished.emit()
 
+    async def _delete_one(self, item_id, item):
+        try:
+            remover = _REMOVERS.get(self.item_type)
+            if remover:
+                await remover(item, item_id, self.api_service)
+
+            # API删除成功后，检查是否需要删除数据库记录
+            if self.delete_db and self.db_manager and self.uid:
+                try:
+                    if self.item_type == "评论":
+                        self.db_manager.delete_comment_permanently(item_id, self.uid)
+                    elif self.item_type == "弹幕":
+                        self.db_manager.delete_danmu_permanently(item_id, self.uid)
+                    elif self.item_type == "通知":
+                        self.db_manager.delete_notify_permanently(item_id, self.uid)
+                    logger.info(f"数据库中的 {self.item_type} {item_id} 已永久删除")
+                except Exception as e:
+                    logger.error(f"删除数据库记录失败: {e}")
+
+            self.item_deleted.emit(item_id)
+            logger.info(f"Deleted {self.item_type} {item_id}")
+        except Exception as e:
+            logger.error(f"Failed to delete {self.item_type} {item_id}: {e}")
+            self.error.emit(f"删除 {self.item_type} (ID: {item_id}) 失败: {e}")
+
+
+class ItemTableModel(QAbstractTableModel):
+    """ItemViewer的数据模型，只保存当前显示项的 (id, item) 列表，单元格由视图按需绘制"""
+    HEADERS = ("选择", "内容")
+
+    def __init__(self, item_type: str, parent=None):
+        super().__init__(parent)
+        self.item_type = item_type
+        self.rows: List[tuple] = []
+        self._text_cache: Dict[int, str] = {}  # item_id -> 显示文本，避免每次绘制都重新拼接
+
+    def clear_cache(self):
+        """数据源整体替换时清空显示文本缓存"""
+        self._text_cache.clear()
+
+    # 增量更新的最大区段数，超过后直接重置模型更便宜
+    MAX_DIFF_RUNS = 64
+
+    def set_rows(self, rows: List[tuple]):
+        """替换显示的行：新旧行互为有序子序列时（搜索收窄/放宽）只增删差异区段，否则整体重置"""
+        old_rows = self.rows
+        if old_rows and rows:
+            if len(rows) <= len(old_rows):
+                runs = self._missing_runs(rows, old_rows)
+                if runs is not None:
+                    for start, end in reversed(runs):
+                        self.beginRemoveRows(QModelIndex(), start, end - 1)
+                        del self.rows[start:end]
+                        self.endRemoveRows()
+                    return
+            else:
+                runs = self._missing_runs(old_rows, rows)
+                if runs is not None:
+                    for start, end in runs:
+                        self.beginInsertRows(QModelIndex(), start, end - 1)
+                        self.rows[start:start] = rows[start:end]
+                        self.endInsertRows()
+                    return
+        self.beginResetModel()
+        self.rows = rows
+        self.endResetModel()
+
+    @classmethod
+    def _missing_runs(cls, shorter: List[tuple], longer: List[tuple]) -> Optional[List[tuple]]:
+        """若shorter是longer的有序子序列（同id且同一对象），返回longer中多出部分的 [start, end) 区段列表"""
+        runs = []
+        i, n = 0, len(shorter)
+        run_start = None
+        for pos, (row_id, item) in enumerate(longer):
+            if i < n and shorter[i][0] == row_id:
+                if shorter[i][1] is not item:
+                    return None
+                i += 1
+                if run_start is not None:
+                    runs.append((run_start, pos))
+                    run_start = None
+            elif run_start is None:
+                run_start = pos
+                if len(runs) >= cls.MAX_DIFF_RUNS:
+                    return None
+        if i < n:
+            return None
+        if run_start is not None:
+            runs.append((run_start, len(longer)))
+        return runs
+
+    def remove_item(self, item_id: int) -> bool:
+        """删除指定id所在的行"""
+        for row, (row_id, _) in enumerate(self.rows):
+            if row_id == item_id:
+                self.beginRemoveRows(QModelIndex(), row, row)
+                del self.rows[row]
+                self.endRemoveRows()
+                self._text_cache.pop(item_id, None)
+                return True
+        return False
+
+    def refresh_check_states(self):
+        """通知视图重绘选择列"""
+        if self.rows:
+            self.dataChanged.emit(self.index(0, 0), self.index(len(self.rows) - 1, 0),
+                                  [Qt.ItemDataRole.CheckStateRole])
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemFlag.NoItemFlags
+        return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        item_id, item = self.rows[index.row()]
+
+        if index.column() == 0:
+            if role == Qt.ItemDataRole.CheckStateRole:
+                return Qt.CheckState.Checked if item.is_selected else Qt.CheckState.Unchecked
+            if role == Qt.ItemDataRole.UserRole:
+                return item_id
+            return None
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            text = self._text_cache.get(item_id)
+            if text is None:
+                text = self._text_cache[item_id] = self._display_text(item)
+            return text
+        if role == Qt.ItemDataRole.UserRole:
+            return item_id, item
+        return None
+
+    def _display_text(self, item) -> str:
+        content_display = item.content
+        if len(content_display) > 200:  # 限制显示长度
+            content_display = content_display[:200] + "..."
+
+        if hasattr(item, 'source'):
+            source = item.source.upper()
+            content_display = f"[{source}] {content_display}"
+        elif self.item_type == "评论":
+            # 如果没有source属性，默认为BILIBILI
+            content_display = f"[BILIBILI] {content_display}"
+        return content_display
+
+
+class FilterThread(QThread):
+    """在后台线程执行搜索：按需构建搜索索引并完成模糊匹配"""
+    result_ready = pyqtSignal(int, int, object, object)  # generation, data_version, 匹配的id列表, 搜索索引
+
+    def __init__(self, generation: int, data_version: int, search_text: str, item_type: str,
+                 search_index: Optional[tuple], entries: Optional[list]):
+        super().__init__()
+        self.generation, self.data_version = generation, data_version
+        self.search_text, self.item_type = search_text, item_type
+        self.search_index = search_index
+        self.entries = entries  # 索引未构建时传入 all_items 的快照
+
+    def run(self):
+        try:
+            index = self.search_index or ItemViewer.build_search_index(self.item_type, self.entries)
+            ids, contents = index
+            matched = [ids[i] for i in fuzzy_filter(self.search_text, contents, preprocessed=True)]
+            self.result_ready.emit(self.generation, self.data_version, matched, index)
+        except Exception as e:
+            logger.error(f"搜索失败: {e}")
+
 
 class ItemViewer(QWidget):
     delete_requested = pyqtSignal(list, str, int)
@@ -233,10 +434,21 @@ class ItemViewer(QWidget):
     def __init__(self, item_type: str, api_service: ApiService):
         super().__init__()
         self.item_type, self.api_service = item_type, api_service
+        # all_items 直接引用调用方传入的字典（不复制），删除时同步从中移除
         self.all_items: Dict[int, any] = {}
-        self.items: Dict[int, any] = {}
-        self.checkboxes: Dict[int, QCheckBox] = {}
+        self._visible_ids: List[int] = []  # 当前过滤结果，按顺序保存 all_items 的键
+        # 搜索索引：(id列表, 搜索文本列表)，数据变化时置空，搜索时按需重建
+        self._search_index: Optional[tuple] = None
+        self._data_version = 0  # all_items 每次变化加一，用于判断后台构建的索引是否过期
+        self._filter_gen = 0  # 每次过滤加一，只应用最新一次过滤的结果
+        self._filter_threads = set()
+        self._selected_count = 0  # 当前显示项中已选中的数量，增量维护
         self.is_deleting = False
+        # 搜索防抖：连续输入只在停顿150ms后过滤一次
+        self._filter_timer = QTimer(self)
+        self._filter_timer.setSingleShot(True)
+        self._filter_timer.setInterval(150)
+        self._filter_timer.timeout.connect(self._do_filter)
 
         self.init_ui()
 
@@ -250,6 +462,7 @@ class ItemViewer(QWidget):
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText(f"搜索{self.item_type}...")
         self.search_input.returnPressed.connect(self.filter_items)
+        self.search_input.textChanged.connect(self.filter_items)
         search_layout.addWidget(self.search_input)
         search_btn = QPushButton("搜索")
         search_btn.clicked.connect(self.filter_items)
@@ -264,24 +477,29 @@ class ItemViewer(QWidget):
         header_layout.addWidget(self.progress_bar)
         layout.addLayout(header_layout)
 
-        # 使用 QTableWidget 替代滚动区域
-        self.table = QTableWidget()
-        self.table.setColumnCount(2)
-        self.table.setHorizontalHeaderLabels(["选择", "内容"])
+        # 使用 QTableView + 模型，只绘制可见行，不为每一项创建表格项对象
+        self.model = ItemTableModel(self.item_type, self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
 
         # 设置表格属性
         self.table.horizontalHeader().setStretchLastSection(True)
         self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Fixed)
         self.table.setColumnWidth(0, 50)
         self.table.verticalHeader().setVisible(False)
+        # 固定行高、不换行：视图无需逐行测量文本高度，长内容以省略号截断
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(40)
+        self.table.setWordWrap(False)
+        self.table.setTextElideMode(Qt.TextElideMode.ElideRight)
         self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
         self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
 
         # 双击事件
-        self.table.cellDoubleClicked.connect(self.on_cell_double_clicked)
+        self.table.doubleClicked.connect(self.on_cell_double_clicked)
 
         # 添加单击事件
-        self.table.cellClicked.connect(self.on_cell_clicked)
+        self.table.clicked.connect(self.on_cell_clicked)
         # 设置objectName
         self.table.setObjectName("commentDataTable")
 
@@ -303,104 +521,100 @@ class ItemViewer(QWidget):
         layout.addLayout(controls_layout)
 
     def set_items_async(self, items: Dict[int, any]):
-        """异步设置项目"""
-        self.all_items = items.copy()
-        # 使用QTimer延迟执行，让UI有机会更新
-        QTimer.singleShot(0, self.filter_items)
+        """异步设置项目，items 的所有权交给viewer"""
+        self.all_items = items
+        self._invalidate_search_index()
+        self.model.clear_cache()
+        # 交给防抖定时器，让UI有机会更新，短时间内多次设置只过滤一次
+        self.filter_items()
 
     def set_items(self, items: Dict[int, any]):
-        self.all_items = items.copy()
-        self.filter_items()
+        """设置项目，items 的所有权交给viewer"""
+        self.all_items = items
+        self._invalidate_search_index()
+        self.model.clear_cache()
+        self._do_filter()
+
+    def _invalidate_search_index(self):
+        self._search_index = None
+        self._data_version += 1
+
+    @staticmethod
+    def build_search_index(item_type: str, entries) -> tuple:
+        """构建搜索索引：(id列表, 已标准化的搜索文本列表)"""
+        ids, contents = [], []
+        for k, v in entries:
+            # 构建包含来源的完整文本
+            if item_type == "弹幕" and hasattr(v, 'source'):
+                search_content = f"[{v.source.upper()}] {v.content}"
+            elif item_type == "评论":
+                source = getattr(v, 'source', 'bilibili').upper()
+                search_content = f"[{source}] {v.content}"
+            else:
+                search_content = v.content
+            ids.append(k)
+            contents.append(normalize_for_search(search_content))
+        return ids, contents
 
     def filter_items(self):
+        """请求一次过滤，重复调用会重新计时，只在最后一次调用后执行"""
+        self._filter_timer.start()
+
+    def _do_filter(self):
+        self._filter_timer.stop()
+        self._filter_gen += 1
         search_text = self.search_input.text().strip()
         if not search_text:
-            self.items = self.all_items.copy()
-        else:
-            # 创建一个包含来源标识的搜索文本
-            self.items = {}
-            for k, v in self.all_items.items():
-                # 构建包含来源的完整文本
-                if self.item_type == "弹幕" and hasattr(v, 'source'):
-                    search_content = f"[{v.source.upper()}] {v.content}"
-                elif self.item_type == "评论":
-                    source = getattr(v, 'source', 'bilibili').upper()
-                    search_content = f"[{source}] {v.content}"
-                else:
-                    search_content = v.content
-
-                # 使用 fuzzy_search 进行搜索
-                if fuzzy_search(search_text, search_content):
-                    self.items[k] = v
-        self.refresh_display()
-
-    def refresh_display(self):
-        """使用表格高效显示数据"""
-        # 清空表格
-        self.table.setRowCount(0)
-
-        # 批量添加行
-        items_list = list(self.items.items())
-        row_count = len(items_list)
+            self._visible_ids = list(self.all_items)
+            self.refresh_display()
+            return
 
-        # 一次性设置行数
-        self.table.setRowCount(row_count)
+        # 匹配在后台线程进行，索引未构建时传入 all_items 的快照一并构建
+        entries = None if self._search_index is not None else list(self.all_items.items())
+        thread = FilterThread(self._filter_gen, self._data_version, search_text, self.item_type,
+                              self._search_index, entries)
+        thread.result_ready.connect(self._on_filter_result)
+        thread.finished.connect(lambda: self._filter_threads.discard(thread))
+        self._filter_threads.add(thread)
+        thread.start()
 
-        # 暂时禁用更新以提高性能
-        self.table.setUpdatesEnabled(False)
+    @pyqtSlot(int, int, object, object)
+    def _on_filter_result(self, generation: int, data_version: int, matched: list, index: tuple):
+        if data_version == self._data_version and self._search_index is None:
+            self._search_index = index
+        if generation != self._filter_gen:
+            return  # 已有更新的过滤请求
+        # 匹配期间可能有项目被删除
+        all_items = self.all_items
+        self._visible_ids = [item_id for item_id in matched if item_id in all_items]
+        self.refresh_display()
 
-        try:
-            for row, (item_id, item) in enumerate(items_list):
-                # 复选框
-                checkbox_item = QTableWidgetItem()
-                checkbox_item.setCheckState(Qt.CheckState.Checked if item.is_selected else Qt.CheckState.Unchecked)
-                checkbox_item.setData(Qt.ItemDataRole.UserRole, item_id)
-                self.table.setItem(row, 0, checkbox_item)
-
-                # 内容
-                content_display = item.content
-                if len(content_display) > 200:  # 限制显示长度
-                    content_display = content_display[:200] + "..."
-
-                if hasattr(item, 'source'):
-                    source = item.source.upper()
-                    content_display = f"[{source}] {content_display}"
-                elif self.item_type == "评论":
-                    # 如果没有source属性，默认为BILIBILI
-                    content_display = f"[BILIBILI] {content_display}"
-
-                content_item = QTableWidgetItem(content_display)
-                content_item.setData(Qt.ItemDataRole.UserRole, (item_id, item))
-                self.table.setItem(row, 1, content_item)
-
-                # 设置行高
-                self.table.setRowHeight(row, 40)
-        finally:
-            # 重新启用更新
-            self.table.setUpdatesEnabled(True)
+    def wait_for_filter(self):
+        """等待后台搜索线程结束（关闭窗口时使用）"""
+        self._filter_gen += 1
+        for thread in list(self._filter_threads):
+            thread.wait()
 
+    def refresh_display(self):
+        """把当前过滤结果交给模型，由视图按需绘制"""
+        all_items = self.all_items
+        rows = [(item_id, all_items[item_id]) for item_id in self._visible_ids]
+        self.model.set_rows(rows)
+        self._selected_count = sum(1 for _, item in rows if item.is_selected)
         self.update_header()
 
-    def on_cell_double_clicked(self, row, column):
+    def on_cell_double_clicked(self, index):
         """处理表格双击事件"""
-        if column == 1:  # 只响应内容列的双击
-            content_item = self.table.item(row, 1)
-            if content_item:
-                item_id, item = content_item.data(Qt.ItemDataRole.UserRole)
-                self.handle_double_click(item_id, item)
+        if index.column() == 1:  # 只响应内容列的双击
+            item_id, item = index.data(Qt.ItemDataRole.UserRole)
+            self.handle_double_click(item_id, item)
 
-    def on_cell_clicked(self, row, column):
+    def on_cell_clicked(self, index):
         """处理单元格单击事件 - 点击任意位置切换选中状态"""
-        checkbox_item = self.table.item(row, 0)
-        if checkbox_item:
-            item_id = checkbox_item.data(Qt.ItemDataRole.UserRole)
-            if item_id:
-                current_state = checkbox_item.checkState()
-                new_state = Qt.CheckState.Unchecked if current_state == Qt.CheckState.Checked else Qt.CheckState.Checked
-                checkbox_item.setCheckState(new_state)
-                # 直接调用 toggle_item 更新数据
-                is_checked = new_state == Qt.CheckState.Checked
-                self.toggle_item(item_id, is_checked)
+        item_id, item = self.model.rows[index.row()]
+        self.toggle_item(item_id, not item.is_selected)
+        check_index = self.model.index(index.row(), 0)
+        self.model.dataChanged.emit(check_index, check_index, [Qt.ItemDataRole.CheckStateRole])
 
     def handle_double_click(self, item_id: int, item):
         """处理双击事件"""
@@ -485,34 +699,32 @@ class ItemViewer(QWidget):
 
     def toggle_item(self, item_id: int, checked: bool):
         """切换项目选中状态"""
-        if item_id in self.items:
-            self.items[item_id].is_selected = checked
-        if item_id in self.all_items:
-            self.all_items[item_id].is_selected = checked
+        item = self.all_items.get(item_id)
+        if item is None:
+            return
+        # 只有显示中的项目会被切换
+        if item.is_selected != checked:
+            self._selected_count += 1 if checked else -1
+        item.is_selected = checked
 
         self.update_header()
 
     def update_header(self):
-        selected = sum(1 for item in self.items.values() if item.is_selected)
-        total = len(self.items)
-        self.header_label.setText(f"{selected} 已选择 / 共 {total} 项")
+        self.header_label.setText(f"{self._selected_count} 已选择 / 共 {len(self._visible_ids)} 项")
 
     def select_all(self):
         """全选/取消全选"""
-        is_all_selected = all(item.is_selected for item in self.items.values()) if self.items else False
+        is_all_selected = bool(self._visible_ids) and self._selected_count == len(self._visible_ids)
         new_state = not is_all_selected
 
         # 更新数据
-        for item_id in self.items.keys():
-            self.items[item_id].is_selected = new_state
-            if item_id in self.all_items:
-                self.all_items[item_id].is_selected = new_state
+        all_items = self.all_items
+        for item_id in self._visible_ids:
+            all_items[item_id].is_selected = new_state
+        self._selected_count = len(self._visible_ids) if new_state else 0
 
         # 更新表格显示
-        for row in range(self.table.rowCount()):
-            checkbox_item = self.table.item(row, 0)
-            if checkbox_item:
-                checkbox_item.setCheckState(Qt.CheckState.Checked if new_state else Qt.CheckState.Unchecked)
+        self.model.refresh_check_states()
 
         self.select_all_btn.setText("取消全选" if new_state else "全选")
         self.update_header()
@@ -526,7 +738,9 @@ class ItemViewer(QWidget):
         if self.is_deleting:
             self.stop_deletion()
         else:
-            selected_items = [(id, item) for id, item in self.items.items() if item.is_selected]
+            all_items = self.all_items
+            selected_items = [(item_id, all_items[item_id]) for item_id in self._visible_ids
+                              if all_items[item_id].is_selected]
             if selected_items:
                 self.start_deletion(selected_items)
             else:
@@ -583,28 +797,18 @@ class ItemViewer(QWidget):
 
     def remove_item(self, item_id: int):
         """删除项目后更新显示"""
-        if item_id in self.all_items:
-            del self.all_items[item_id]
-        if item_id in self.items:
-            del self.items[item_id]
-
-            # 找到并删除表格中的行
-            for row in range(self.table.rowCount()):
-                checkbox_item = self.table.item(row, 0)
-                if checkbox_item and checkbox_item.data(Qt.ItemDataRole.UserRole) == item_id:
-                    self.table.removeRow(row)
-                    break
+        item = self.all_items.pop(item_id, None)
+        if item is None:
+            return
+        self._invalidate_search_index()
 
+        # 删除表格中的行
+        if self.model.remove_item(item_id):
+            self._visible_ids.remove(item_id)
+            if item.is_selected:
+                self._selected_count -= 1
             self.update_header()
 
-    def _connect_double_click_signal(self, text_edit, item_id, item):
-        """安全地连接双击信号，避免变量捕获问题"""
-
-        def on_double_click():
-            self.handle_double_click(item_id, item)
-
-        text_edit.double_clicked.connect(on_double_click)
-
 class CommentCleanScreen(QWidget):
     # 添加返回信号
     back_to_tools = pyqtSignal()
@@ -612,6 +816,10 @@ class CommentCleanScreen(QWidget):
     open_comment_detail = pyqtSignal(object)
     window_closed = pyqtSignal()
 
+    # 活动信息的分类，按下标存放在并列的计数/速度列表中
+    ACTIVITY_CATEGORIES = ("liked", "replyed", "ated", "system", "aicu_comments", "aicu_danmus")
+    _ACTIVITY_INDEX = {cat: i for i, cat in enumerate(ACTIVITY_CATEGORIES)}
+
     def __init__(self, api_service: ApiService, aicu_state: bool):
         super().__init__()
         self.api_service, self.aicu_state = api_service, aicu_state
@@ -629,22 +837,21 @@ class CommentCleanScreen(QWidget):
             self.sync_manager = None
 
         self.progress_state = FetchProgressState()
-        self.delete_threads = {}
+        self.delete_tasks = {}  # item_type -> DeleteTask/CascadeDeleteTask
         self.all_comments, self.all_danmus, self.all_notifies = {}, {}, {}
         self.detail_windows = []
         # 添加状态变量
         self.is_cascade_delete_enabled = True
         self.is_delete_db_enabled = False
-        # 存储各类型的活动信息
-        self.activity_stats = {
-            "liked": {"count": 0, "speed": 0.0, "active": False},
-            "replyed": {"count": 0, "speed": 0.0, "active": False},
-            "ated": {"count": 0, "speed": 0.0, "active": False},
-            "system": {"count": 0, "speed": 0.0, "active": False},
-            "aicu_comments": {"count": 0, "speed": 0.0, "active": False},
-            "aicu_danmus": {"count": 0, "speed": 0.0, "active": False}
-        }
+        # 存储各类型的活动信息：计数、速度按分类下标存放，活跃分类的下标按顺序保存
+        self._activity_counts = [0] * len(self.ACTIVITY_CATEGORIES)
+        self._activity_speeds = [0.0] * len(self.ACTIVITY_CATEGORIES)
+        self._active_indices: List[int] = []
         self.completed_stages = set()
+        # 获取过程中以约10Hz的频率从获取线程取进度，避免逐条跨线程发信号
+        self._activity_poll = QTimer(self)
+        self._activity_poll.setInterval(100)
+        self._activity_poll.timeout.connect(self._drain_activity)
         # 初始化日志处理器
         self.log_handler = LogHandler(max_logs=50)
         self.log_handler.setFormatter(
@@ -798,7 +1005,7 @@ class CommentCleanScreen(QWidget):
 
         # 标题
         title_label = QLabel("评论清理工具")
-        title_label.setStyleSheet("font-size: 18px; font-weight: bold; color: #ecf0f1;")
+        title_label.setObjectName("commentCleanTitle")
         toolbar_layout.addWidget(title_label)
         toolbar_layout.addStretch()
         if DRISSION_SERVICE_AVAILABLE:
@@ -832,7 +1039,7 @@ class CommentCleanScreen(QWidget):
         self.activity_label = QLabel("")
         activity_font = self.activity_label.font(); activity_font.setPointSize(11); self.activity_label.setFont(activity_font)
         self.activity_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.activity_label.setStyleSheet("color: #7FB3D3; margin-top: 10px;")
+        self.activity_label.setObjectName("fetchActivityLabel")
         self.activity_label.setWordWrap(True)
         loading_layout.addWidget(self.activity_label)
 
@@ -926,17 +1133,6 @@ class CommentCleanScreen(QWidget):
         self.log_display = QTextEdit()
         self.log_display.setReadOnly(True)
         self.log_display.setObjectName("logDisplay")
-        self.log_display.setStyleSheet("""
-            QTextEdit#logDisplay {
-                background-color: rgba(30, 41, 59, 0.8);
-                border: 1px solid #475569;
-                border-radius: 8px;
-                color: #e2e8f0;
-                font-family: Consolas, Monaco, monospace;
-                font-size: 12px;
-                padding: 5px;
-            }
-        """)
         log_layout.addWidget(self.log_display)
 
         content_layout.addWidget(log_frame)
@@ -1090,13 +1286,12 @@ class CommentCleanScreen(QWidget):
             self.fetch_thread.stop()
             threads_to_stop.append(('fetch_thread', self.fetch_thread))
 
-        # 检查删除线程
-        for thread_name, thread in self.delete_threads.items():
-            if thread and thread.isRunning():
-                logger.info(f"停止删除线程: {thread_name}")
-                if hasattr(thread, 'stop'):
-                    thread.stop()
-                threads_to_stop.append((thread_name, thread))
+        # 检查删除任务
+        for task_name, task in self.delete_tasks.items():
+            if task and task.isRunning():
+                logger.info(f"停止删除任务: {task_name}")
+                task.stop()
+                threads_to_stop.append((task_name, task))
 
         if threads_to_stop:
             # 显示等待提示
@@ -1150,41 +1345,61 @@ class CommentCleanScreen(QWidget):
         self.activity_indicator.setVisible(True)
 
         self.fetch_thread = FetchThread(self.api_service, self.aicu_state, self.progress_state)
-        self.fetch_thread.status_update.connect(self.status_label.setText)
-        self.fetch_thread.activity_update.connect(self.on_activity_update)
         self.fetch_thread.finished.connect(self.on_fetch_finished)
         self.fetch_thread.error.connect(self.on_fetch_error)
         self.fetch_thread.start()
+        self._activity_poll.start()
+
+    def _drain_activity(self):
+        """把获取线程累积的最新进度刷新到界面"""
+        thread = getattr(self, 'fetch_thread', None)
+        if not thread:
+            return
+        status, pending = thread.take_updates()
+        for activity_info in pending.values():
+            self.on_activity_update(activity_info)
+        if status is not None:
+            self.status_label.setText(status)
+
+    def _stop_activity_poll(self):
+        """停止轮询，并取走最后一批进度"""
+        self._activity_poll.stop()
+        self._drain_activity()
 
     @pyqtSlot(object)
     def on_activity_update(self, activity_info: ActivityInfo):
         """处理活动信息更新"""
         try:
             category = activity_info.category
-            if category in self.activity_stats:
-                self.activity_stats[category] = {
-                    "count": activity_info.current_count,
-                    "speed": activity_info.speed,
-                    "active": True
-                }
-
-            # 更新活动信息显示
+            i = self._ACTIVITY_INDEX.get(category)
+            if i is not None:
+                self._activity_counts[i] = activity_info.current_count
+                self._activity_speeds[i] = activity_info.speed
+                if i not in self._active_indices:
+                    insort(self._active_indices, i)
+
+            # 更新活动信息显示：从后往前取最后2个有数据的活跃分类
             active_info = []
-            for cat, stats in self.activity_stats.items():
-                if stats["active"] and stats["count"] > 0:
-                    if stats["speed"] > 0:
-                        active_info.append(f"{cat}: {stats['count']} 项 [{stats['speed']:.1f}/s]")
+            counts, speeds = self._activity_counts, self._activity_speeds
+            for j in reversed(self._active_indices):
+                count, speed = counts[j], speeds[j]
+                if count > 0:
+                    cat = self.ACTIVITY_CATEGORIES[j]
+                    if speed > 0:
+                        active_info.append(f"{cat}: {count} 项 [{speed:.1f}/s]")
                     else:
-                        active_info.append(f"{cat}: {stats['count']} 项")
+                        active_info.append(f"{cat}: {count} 项")
+                    if len(active_info) == 2:
+                        break
 
             # 如果当前阶段结束，标记为完成
             if activity_info.speed == 0 and activity_info.current_count > 0:
                 self.completed_stages.add(category)
-                if category in self.activity_stats:
-                    self.activity_stats[category]["active"] = False
+                if i in self._active_indices:
+                    self._active_indices.remove(i)
 
             if active_info:
-                self.activity_label.setText(" | ".join(active_info[-2:]))  # 只显示最后2个活跃的
+                self.activity_label.setText(" | ".join(reversed(active_info)))  # 只显示最后2个活跃的
             else:
                 self.activity_label.setText("")
 
@@ -1193,6 +1408,7 @@ class CommentCleanScreen(QWidget):
 
     @pyqtSlot(object)
     def on_fetch_finished(self, result):
+        self._stop_activity_poll()
         data, progress = result
         if data:
             self.status_label.setText("数据加载完成！")
@@ -1221,9 +1437,9 @@ class CommentCleanScreen(QWidget):
 
             # 显示最终统计信息
             final_stats = []
-            for cat, stats in self.activity_stats.items():
-                if stats["count"] > 0:
-                    final_stats.append(f"{cat}: {stats['count']}")
+            for cat, count in zip(self.ACTIVITY_CATEGORIES, self._activity_counts):
+                if count > 0:
+                    final_stats.append(f"{cat}: {count}")
             if final_stats:
                 self.activity_label.setText("获取完成: " + " | ".join(final_stats))
 
@@ -1244,6 +1460,7 @@ class CommentCleanScreen(QWidget):
 
     @pyqtSlot(str)
     def on_fetch_error(self, error):
+        self._stop_activity_poll()
         logger.error(f"Fetch error in UI: {error}")
         self.status_label.setText(f"获取数据失败: {error}")
         self.activity_indicator.setVisible(False)
@@ -1257,11 +1474,10 @@ class CommentCleanScreen(QWidget):
         viewer_map = {"评论": self.comment_viewer, "弹幕": self.danmu_viewer, "通知": self.notify_viewer}
 
         if not items:
-            if item_type in self.delete_threads and (thread := self.delete_threads.get(item_type)):
-                if thread.isRunning():
-                    thread.stop()
-                    thread.wait()
-                self.delete_threads[item_type] = None
+            if item_type in self.delete_tasks and (task := self.delete_tasks.get(item_type)):
+                if task.isRunning():
+                    task.stop()
+                self.delete_tasks[item_type] = None
             return
 
         # 使用状态变量而不是直接读取isChecked()
@@ -1275,18 +1491,18 @@ class CommentCleanScreen(QWidget):
             if self.database_enabled and self.is_delete_db_enabled:
                 uid, _, _ = self.api_service.get_cached_user_info()
 
-            thread = CascadeDeleteThread(
+            task = CascadeDeleteTask(
                 self.api_service, cascade_list, sleep_seconds,
                 delete_db=self.is_delete_db_enabled,
                 db_manager=self.db_manager if self.database_enabled else None,
                 uid=uid
             )
-            thread.comment_deleted.connect(self.comment_viewer.on_item_deleted)
-            thread.danmu_deleted.connect(self.danmu_viewer.on_item_deleted)
-            thread.notify_deleted.connect(self.notify_viewer.on_item_deleted)
-            thread.finished.connect(self.notify_viewer.on_deletion_finished)
-            thread.progress.connect(lambda c, t: self.notify_viewer.progress_bar.setValue(c))
-            thread.error.connect(self.on_delete_error)
+            task.comment_deleted.connect(self.comment_viewer.on_item_deleted)
+            task.danmu_deleted.connect(self.danmu_viewer.on_item_deleted)
+            task.notify_deleted.connect(self.notify_viewer.on_item_deleted)
+            task.finished.connect(self.notify_viewer.on_deletion_finished)
+            task.progress.connect(lambda c, t: self.notify_viewer.progress_bar.setValue(c))
+            task.error.connect(self.on_delete_error)
         else:
             viewer = viewer_map.get(item_type)
             if not viewer: return
@@ -1297,48 +1513,46 @@ class CommentCleanScreen(QWidget):
             if self.database_enabled and self.is_delete_db_enabled:
                 uid, _, _ = self.api_service.get_cached_user_info()
 
-            thread = DeleteThread(
+            task = DeleteTask(
                 self.api_service, items, item_type, sleep_seconds,
                 delete_db=self.is_delete_db_enabled,
                 db_manager=self.db_manager if self.database_enabled else None,
                 uid=uid
             )
-            thread.item_deleted.connect(viewer.on_item_deleted)
-            thread.finished.connect(viewer.on_deletion_finished)
-            thread.progress.connect(lambda c, t: viewer.progress_bar.setValue(c))
-            thread.error.connect(self.on_delete_error)
-
-        self.delete_threads[item_type] = thread
-        thread.start()
+            task.item_deleted.connect(viewer.on_item_deleted)
+            task.finished.connect(viewer.on_deletion_finished)
+            task.progress.connect(lambda c, t: viewer.progress_bar.setValue(c))
+            task.error.connect(self.on_delete_error)
+
+        self.delete_tasks[item_type] = task
+        task.start()
+
+    @staticmethod
+    def _index_by_notify(items: dict) -> Dict[int, list]:
+        """按notify_id分组，返回 notify_id -> [(id, item)]"""
+        index = {}
+        for item_id, item in items.items():
+            if item.notify_id is not None:
+                index.setdefault(item.notify_id, []).append((item_id, item))
+        return index
 
     def _build_cascade_delete_list(self, notify_items: list) -> list:
         cascade_items = []
 
+        # 评论和弹幕各遍历一次建立索引，之后每个通知直接查表
+        comments_by_notify = self._index_by_notify(self.all_comments)
+        danmus_by_notify = self._index_by_notify(self.all_danmus)
+
         for notify_id, notify in notify_items:
             cascade_items.append(('notify', notify_id, notify))
-            logger.debug(f"Building cascade list for notify {notify_id}")
-
-            # 查找关联的评论
-            found_comments = 0
-            for comment_id, comment in self.all_comments.items():
-                if comment.notify_id == notify_id:
-                    cascade_items.append(('comment', comment_id, comment))
-                    found_comments += 1
-                    logger.debug(f"Found associated comment {comment_id} for notify {notify_id}")
-
-            if found_comments == 0:
-                logger.debug(f"No associated comments found for notify {notify_id}")
-
-            # 查找关联的弹幕
-            found_danmus = 0
-            for danmu_id, danmu in self.all_danmus.items():
-                if danmu.notify_id == notify_id:
-                    cascade_items.append(('danmu', danmu_id, danmu))
-                    found_danmus += 1
-                    logger.debug(f"Found associated danmu {danmu_id} for notify {notify_id}")
-
-            if found_danmus == 0:
-                logger.debug(f"No associated danmus found for notify {notify_id}")
+
+            # 关联的评论
+            for comment_id, comment in comments_by_notify.get(notify_id, ()):
+                cascade_items.append(('comment', comment_id, comment))
+
+            # 关联的弹幕
+            for danmu_id, danmu in danmus_by_notify.get(notify_id, ()):
+                cascade_items.append(('danmu', danmu_id, danmu))
 
         logger.info(f"Cascade delete list built: {len(cascade_items)} items total")
         return cascade_items
@@ -1566,16 +1780,18 @@ class CommentCleanScreen(QWidget):
                 window.close()
         self.detail_windows.clear()
         # 停止线程
+        self._activity_poll.stop()
+        for viewer_name in ('comment_viewer', 'danmu_viewer', 'notify_viewer'):
+            if hasattr(self, viewer_name):
+                getattr(self, viewer_name).wait_for_filter()
         if hasattr(self, 'fetch_thread') and self.fetch_thread and self.fetch_thread.isRunning():
             self.fetch_thread.stop()
             self.fetch_thread.wait(2000)
 
-        # 停止删除线程
-        for thread in self.delete_threads.values():
-            if thread and thread.isRunning():
-                if hasattr(thread, 'stop'):
-                    thread.stop()
-                thread.wait(1000)
+        # 取消删除任务
+        for task in self.delete_tasks.values():
+            if task and task.isRunning():
+                task.cancel()
         # 清理数据字典以释放内存
         self.all_comments.clear()
         self.all_danmus.clear()
@@ -1583,99 +1799,114 @@ class CommentCleanScreen(QWidget):
         # 清理viewer中的数据
         if hasattr(self, 'comment_viewer'):
             self.comment_viewer.all_items.clear()
-            self.comment_viewer.items.clear()
-            self.comment_viewer.checkboxes.clear()
+            self.comment_viewer._visible_ids.clear()
+            self.comment_viewer.model.set_rows([])
+            self.comment_viewer.model.clear_cache()
 
 
         if hasattr(self, 'danmu_viewer'):
             self.danmu_viewer.all_items.clear()
-            self.danmu_viewer.items.clear()
-            self.danmu_viewer.checkboxes.clear()
+            self.danmu_viewer._visible_ids.clear()
+            self.danmu_viewer.model.set_rows([])
+            self.danmu_viewer.model.clear_cache()
 
         if hasattr(self, 'notify_viewer'):
             self.notify_viewer.all_items.clear()
-            self.notify_viewer.items.clear()
-            self.notify_viewer.checkboxes.clear()
+            self.notify_viewer._visible_ids.clear()
+            self.notify_viewer.model.set_rows([])
+            self.notify_viewer.model.clear_cache()
 
         self.window_closed.emit()  # 发送窗口关闭信号！
         super().closeEvent(event)
 
 
-class CascadeDeleteThread(QThread):
+class CascadeDeleteTask(AsyncTask):
     comment_deleted, danmu_deleted, notify_deleted = pyqtSignal(int), pyqtSignal(int), pyqtSignal(int)
     finished, progress = pyqtSignal(), pyqtSignal(int, int)
     error = pyqtSignal(str)
 
-    def __init__(self, api_service, cascade_items, sleep_seconds, delete_db=False, db_manager=None, uid=None):
+    def __init__(self, api_service, cascade_items, sleep_seconds, delete_db=False, db_manager=None, uid=None,
+                 concurrency=4):
         super().__init__()
         self.api_service, self.cascade_items, self.sleep_seconds = api_service, cascade_items, sleep_seconds
         self.delete_db = delete_db
         self.db_manager = db_manager
         self.uid = uid
-        self._is_running = True
+        self.concurrency = max(1, concurrency)  # 每批并发删除的数量
 
-    def stop(self): self._is_running = False
-
-    def run(self):
-        loop = asyncio.new_event_loop(); asyncio.set_event_loop(loop)
-        try: loop.run_until_complete(self._delete_items())
+    async def _run(self):
+        try: await self._delete_items()
+        except asyncio.CancelledError:
+            logger.info("[CascadeDeleteTask] cascade delete cancelled")
         except Exception as e:
-            logger.error(f"Unexpected error in CascadeDeleteThread: {e}")
+            logger.error(f"Unexpected error in CascadeDeleteTask: {e}")
             self.error.emit(str(e))
-        finally:
-            try: loop.close()
-            except: pass
+
+    def _batches(self):
+        """把级联列表切成批次：同一批内类型相同且不超过 concurrency 个，保证通知先于其评论删除"""
+        batch = []
+        for entry in self.cascade_items:
+            if batch and (entry[0] != batch[0][0] or len(batch) >= self.concurrency):
+                yield batch
+                batch = []
+            batch.append(entry)
+        if batch:
+            yield batch
 
     async def _delete_items(self):
-        total = len(self.cascade_items)
-        for current, (item_type, item_id, item) in enumerate(self.cascade_items, 1):
+        """按批并发删除，批与批之间按删除间隔等待"""
+        total, current = len(self.cascade_items), 0
+        for batch in self._batches():
             if not self._is_running: break
+            await asyncio.gather(*(self._delete_one(*entry) for entry in batch))
+            current += len(batch)
             self.progress.emit(current, total)
-            try:
-                if item_type == "comment":
-                    from ..api.comment import remove_comment
-                    await remove_comment(item, item_id, self.api_service)
-                    if self.delete_db and self.db_manager and self.uid:
-                        try:
-                            self.db_manager.delete_comment_permanently(item_id, self.uid)
-                            logger.info(f"数据库中的评论 {item_id} 已永久删除")
-                        except Exception as e:
-                            logger.error(f"删除数据库评论记录失败: {e}")
-                    self.comment_deleted.emit(item_id)
-                elif item_type == "notify":
-                    from ..api.notify import remove_notify
-                    await remove_notify(item, item_id, self.api_service)
-                    if self.delete_db and self.db_manager and self.uid:
-                        try:
-                            self.db_manager.delete_notify_permanently(item_id, self.uid)
-                            logger.info(f"数据库中的通知 {item_id} 已永久删除")
-                        except Exception as e:
-                            logger.error(f"删除数据库通知记录失败: {e}")
-                    self.notify_deleted.emit(item_id)
-                elif item_type == "danmu":
-                    logger.warning(f"Skipping cascade delete for danmu {item_id} as it's not supported.")
-                    if self.delete_db and self.db_manager and self.uid:
-                        try:
-                            self.db_manager.delete_danmu_permanently(item_id, self.uid)
-                            logger.info(f"数据库中的弹幕 {item_id} 已永久删除")
-                        except Exception as e:
-                            logger.error(f"删除数据库弹幕记录失败: {e}")
-                    self.danmu_deleted.emit(item_id)
-                logger.info(f"Successfully processed cascade item: {item_type} {item_id}")
-            except Exception as e:
-                error_message = f"删除失败: 无法删除 {item_type} (ID: {item_id}).\n原因: {e}"
-                logger.error(error_message)
-                self.error.emit(error_message)
-                if self._is_running:
-                    logger.info(f"[CascadeDeleteThread] sleep 5 seconds after error...")
-                    print(f"[CascadeDeleteThread] sleep 5 seconds after error...")
-                    await asyncio.sleep(5)
             if self._is_running and current < total:
-                logger.info(f"[CascadeDeleteThread] sleep {self.sleep_seconds} seconds before next cascade delete...")
-                print(f"[CascadeDeleteThread] sleep {self.sleep_seconds} seconds before next cascade delete...")
+                logger.info(f"[CascadeDeleteTask] sleep {self.sleep_seconds} seconds before next cascade delete...")
+                print(f"[CascadeDeleteTask] sleep {self.sleep_seconds} seconds before next cascade delete...")
                 await asyncio.sleep(self.sleep_seconds)
         self.finished.emit()
 
+    async def _delete_one(self, item_type, item_id, item):
+        try:
+            remover = _REMOVERS.get(item_type)
+            if remover:
+                await remover(item, item_id, self.api_service)
+            if item_type == "comment":
+                if self.delete_db and self.db_manager and self.uid:
+                    try:
+                        self.db_manager.delete_comment_permanently(item_id, self.uid)
+                        logger.info(f"数据库中的评论 {item_id} 已永久删除")
+                    except Exception as e:
+                        logger.error(f"删除数据库评论记录失败: {e}")
+                self.comment_deleted.emit(item_id)
+            elif item_type == "notify":
+                if self.delete_db and self.db_manager and self.uid:
+                    try:
+                        self.db_manager.delete_notify_permanently(item_id, self.uid)
+                        logger.info(f"数据库中的通知 {item_id} 已永久删除")
+                    except Exception as e:
+                        logger.error(f"删除数据库通知记录失败: {e}")
+                self.notify_deleted.emit(item_id)
+            elif item_type == "danmu":
+                logger.warning(f"Skipping cascade delete for danmu {item_id} as it's not supported.")
+                if self.delete_db and self.db_manager and self.uid:
+                    try:
+                        self.db_manager.delete_danmu_permanently(item_id, self.uid)
+                        logger.info(f"数据库中的弹幕 {item_id} 已永久删除")
+                    except Exception as e:
+                        logger.error(f"删除数据库弹幕记录失败: {e}")
+                self.danmu_deleted.emit(item_id)
+            logger.info(f"Successfully processed cascade item: {item_type} {item_id}")
+        except Exception as e:
+            error_message = f"删除失败: 无法删除 {item_type} (ID: {item_id}).\n原因: {e}"
+            logger.error(error_message)
+            self.error.emit(error_message)
+            if self._is_running:
+                logger.info(f"[CascadeDeleteTask] sleep 5 seconds after error...")
+                print(f"[CascadeDeleteTask] sleep 5 seconds after error...")
+                await asyncio.sleep(5)
+
 
 class LoginCacheThread(QThread):
     """登录后缓存用户信息的线程"""
@@ -1840,31 +2071,7 @@ class IncrementalFetchThread(QThread):
                 if self._is_running:
                     self.error.emit(str(e))
             finally:
-                try:
-                    tasks = asyncio.all_tasks(loop=loop)
-                    for task in tasks:
-                        if not task.done():
-                            task.cancel()
-                    if tasks:
-                        try:
-                            loop.run_until_complete(
-                                asyncio.wait_for(
-                                    asyncio.gather(*tasks, return_exceptions=True),
-                                    timeout=2.0
-                                )
-                            )
-                        except asyncio.TimeoutError:
-                            logger.warning("Some incremental fetch tasks didn't cancel in time")
-                        except Exception as e:
-                            logger.error(f"Error during incremental fetch task cancellation: {e}")
-                except Exception as e:
-                    logger.error(f"Error cancelling incremental fetch tasks: {e}")
-                finally:
-                    try:
-                        if not loop.is_closed():
-                            loop.close()
-                    except Exception as e:
-                        logger.error(f"Error closing incremental fetch event loop: {e}")
+                _shutdown_loop(loop, "incremental fetch")
 
         async def _incremental_fetch_with_session(self, progress_callback):
             """执行增量获取的核心逻辑"""
@@ -2313,30 +2520,6 @@ class IncrementalFetchThread(QThread):
                 raise
 
 
-class ClickableTextEdit(QTextEdit):
-    """支持双击事件的 QTextEdit"""
-    double_clicked = pyqtSignal()
-
-    def mouseDoubleClickEvent(self, event):
-        if event.button() == Qt.MouseButton.LeftButton:
-            self.double_clicked.emit()
-        super().mouseDoubleClickEvent(event)
-
-    def mousePressEvent(self, event):
-        """确保单击也能正常工作"""
-        super().mousePressEvent(event)
-
-    def enterEvent(self, event):
-        """鼠标悬停时改变光标"""
-        self.setCursor(Qt.CursorShape.PointingHandCursor)
-        super().enterEvent(event)
-
-    def leaveEvent(self, event):
-        """鼠标离开时恢复光标"""
-        self.setCursor(Qt.CursorShape.ArrowCursor)
-        super().leaveEvent(event)
-
-
 class DatabaseLoadThread(QThread):
     """数据库加载线程"""
     data_loaded = pyqtSignal(object, object, object)
@@ -1,5 +1,10 @@
 import logging
+import os
+import pickle
 import time
+from collections import Counter
+from datetime import datetime
+from operator import itemgetter
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel,
     QFrame, QGridLayout, QProgressBar, QScrollArea, QListWidget,
@@ -140,11 +145,148 @@ class StatsLoader(QThread):
             return stats
 
 
+class MessageStatsLoader(QThread):
+    """私信统计加载线程，读取私信管理工具的缓存并完成统计"""
+    data_loaded = pyqtSignal(object)
+    error = pyqtSignal(str)
+
+    def __init__(self, api_service: ApiService):
+        super().__init__()
+        self.api_service = api_service
+        self.should_stop = False
+
+    def stop(self):
+        self.should_stop = True
+
+    def run(self):
+        try:
+            # 尝试从缓存文件读取私信数据
+            home_dir = os.path.expanduser("~")
+            cache_file = os.path.join(home_dir, ".bilibili_tools", "message_cache.pkl")
+
+            # 一次stat同时完成存在性检查和修改时间读取
+            try:
+                cache_stat = os.stat(cache_file)
+            except FileNotFoundError:
+                self.data_loaded.emit({'stats': {}, 'ranking': []})
+                return
+
+            # 按stat得到的大小一次性读入内存再反序列化，避免pickle.load逐块小读
+            buffer = bytearray(cache_stat.st_size)
+            view = memoryview(buffer)
+            read_size = 0
+            with open(cache_file, 'rb', buffering=0) as f:
+                while read_size < cache_stat.st_size:
+                    chunk_size = f.readinto(view[read_size:])
+                    if not chunk_size:
+                        break
+                    read_size += chunk_size
+            view.release()
+
+            data = pickle.loads(buffer[:read_size] if read_size < cache_stat.st_size else buffer)
+            messages = data.get('messages', [])
+
+            if self.should_stop:
+                return
+
+            if not messages:
+                self.data_loaded.emit({'stats': {}, 'ranking': []})
+                return
+
+            # 获取当前用户UID
+            current_uid = None
+            if self.api_service:
+                current_uid, _, _ = self.api_service.get_cached_user_info()
+
+            # 每个会话的消息数只数一次，基础统计和排行榜共用
+            talker_counter = Counter(map(itemgetter('talker_id'), messages))
+            # 只取前30名（most_common(n)内部即heapq.nlargest，不对全部用户排序）
+            top_talkers = talker_counter.most_common(30)
+
+            stats = self._compute_stats(messages, talker_counter, top_talkers, cache_stat.st_mtime)
+            ranking = self._compute_ranking(messages, top_talkers, current_uid)
+
+            if not self.should_stop:
+                self.data_loaded.emit({'stats': stats, 'ranking': ranking})
+
+        except Exception as e:
+            logger.error(f"加载私信统计数据失败: {e}")
+            self.error.emit(f"加载失败: {e}")
+
+    def _compute_stats(self, messages, talker_counter, top_talkers, cache_mtime):
+        """计算私信基础统计和活跃度"""
+        # 计算统计数据
+        total_messages = len(messages)
+        total_conversations = len(talker_counter)
+
+        # 单次遍历完成未读数、今日消息数和时间范围统计，不再构造中间时间戳列表
+        now = datetime.now()
+        today_start = datetime(now.year, now.month, now.day).timestamp()
+        today_end = today_start + 24 * 3600
+        unread_messages = 0
+        today_messages = 0
+        earliest = float('inf')
+        latest = float('-inf')
+        for msg in messages:
+            if msg.get('is_unread', False):
+                unread_messages += 1
+
+            ts = msg['timestamp']
+            if ts > 1e10:  # 毫秒级时间戳
+                ts = ts / 1000
+            if today_start <= ts < today_end:
+                today_messages += 1
+            if ts < earliest:
+                earliest = ts
+            if ts > latest:
+                latest = ts
+
+        date_range = f"{datetime.fromtimestamp(earliest).strftime('%Y-%m-%d')} 至 {datetime.fromtimestamp(latest).strftime('%Y-%m-%d')}"
+
+        # 最活跃的用户即排行榜第一名
+        if top_talkers:
+            most_active_uid, most_active_count = top_talkers[0]
+            most_active_user = f"UID:{most_active_uid} ({most_active_count}条)"
+        else:
+            most_active_user = "无数据"
+
+        # 计算日均消息数
+        days_span = (latest - earliest) / (24 * 3600)
+        avg_daily = total_messages / max(days_span, 1)
+
+        # 缓存时间
+        cache_time = datetime.fromtimestamp(cache_mtime).strftime('%Y-%m-%d %H:%M:%S')
+
+        return {
+            'total_messages': total_messages,
+            'total_conversations': total_conversations,
+            'unread_messages': unread_messages,
+            'today_messages': today_messages,
+            'date_range': date_range,
+            'most_active_user': most_active_user,
+            'avg_daily_messages': avg_daily,
+            'cache_time': cache_time
+        }
+
+    def _compute_ranking(self, messages, top_talkers, current_uid):
+        """统计互动排行榜，返回可直接填表的 (排名, uid, UID文本, 收到消息, 发送消息, 总互动次数) 列表"""
+        # 总互动次数直接取会话计数，只对自己发送的消息再数一遍，收到的消息由两者相减得到
+        sent_counter = Counter(msg['talker_id'] for msg in messages if msg['sender_uid'] == current_uid)
+
+        return [
+            (rank, uid, f"UID: {uid}", total - sent_counter[uid], sent_counter[uid], total)
+            for rank, (uid, total) in enumerate(top_talkers, 1)
+        ]
+
+
 class CommentStatsScreen(QWidget):
     """数据统计界面"""
 
     back_to_tools = pyqtSignal()
     window_closed = pyqtSignal()
+
+    # 关闭窗口时还没结束的加载线程保存在这里，线程结束并被删除后才放开引用
+    _detached_threads = set()
     def __init__(self, api_service: ApiService, aicu_state: bool):
         super().__init__()
         self.api_service = api_service
@@ -153,6 +295,7 @@ class CommentStatsScreen(QWidget):
 
         self.init_ui()
         self.load_data()
+        self.load_message_stats()
 
     def init_ui(self):
         """初始化界面"""
@@ -439,7 +582,6 @@ class CommentStatsScreen(QWidget):
 
                 # 发布时间
                 try:
-                    import time
                     time_str = time.strftime('%Y-%m-%d %H:%M', time.localtime(comment_data['created_time']))
                 except:
                     time_str = "未知时间"
@@ -590,11 +732,14 @@ class CommentStatsScreen(QWidget):
 
         # 统计内容容器
         stats_widget = QWidget()
-        message_stats_layout = QVBoxLayout(stats_widget)
-        message_stats_layout.setSpacing(20)
+        self.message_stats_layout = QVBoxLayout(stats_widget)
+        self.message_stats_layout.setSpacing(20)
 
-        # 私信统计卡片
-        self.create_message_stats_cards(message_stats_layout)
+        # 添加加载提示，统计卡片在后台线程读取缓存后再创建
+        self.message_loading_label = QLabel("正在加载私信统计数据...")
+        self.message_loading_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.message_loading_label.setStyleSheet("color: #ecf0f1; font-size: 16px; padding: 50px;")
+        self.message_stats_layout.addWidget(self.message_loading_label)
 
         scroll.setWidget(stats_widget)
 
@@ -602,15 +747,33 @@ class CommentStatsScreen(QWidget):
         tab_layout = QVBoxLayout(widget)
         tab_layout.addWidget(scroll)
 
-    def create_message_stats_cards(self, layout):
+    def load_message_stats(self):
+        """在后台线程加载私信统计数据"""
+        if hasattr(self, 'message_loader_thread') and self.message_loader_thread.isRunning():
+            return
+
+        self.message_loader_thread = MessageStatsLoader(self.api_service)
+        self.message_loader_thread.data_loaded.connect(self.on_message_stats_loaded)
+        self.message_loader_thread.error.connect(self.on_message_stats_error)
+        self.message_loader_thread.start()
+
+    @pyqtSlot(object)
+    def on_message_stats_loaded(self, result):
+        """私信统计数据加载完成"""
+        self.message_loading_label.deleteLater()
+        self.create_message_stats_cards(self.message_stats_layout, result['stats'], result['ranking'])
+
+    @pyqtSlot(str)
+    def on_message_stats_error(self, error_msg):
+        """私信统计数据加载失败"""
+        self.message_loading_label.setText(f"加载失败: {error_msg}")
+
+    def create_message_stats_cards(self, layout, message_stats, ranking):
         """创建私信统计卡片"""
         # 基础统计卡片
         basic_card = self.create_card("私信基础统计")
         basic_grid = QGridLayout()
 
-        # 获取真实的私信统计数据
-        message_stats = self.get_message_stats()
-
         stats_items = [
             ("总私信数", str(message_stats.get('total_messages', 0)), "#FFFFFF"),
             ("总会话数", str(message_stats.get('total_conversations', 0)), "#FFFFFF"),
@@ -673,237 +836,93 @@ class CommentStatsScreen(QWidget):
 
         # 创建排行榜表格
         from PyQt6.QtWidgets import QTableWidget, QTableWidgetItem
-        self.ranking_table = QTableWidget()
-        self.ranking_table.setObjectName("likeRankingTable")
-        self.ranking_table.setColumnCount(5)
-        self.ranking_table.setHorizontalHeaderLabels(["排名", "UID", "收到消息", "发送消息", "总互动次数"])
+        self.interaction_table = QTableWidget()
+        self.interaction_table.setObjectName("likeRankingTable")
+        self.interaction_table.setColumnCount(5)
+        self.interaction_table.setHorizontalHeaderLabels(["排名", "UID", "收到消息", "发送消息", "总互动次数"])
 
-        self.ranking_table.setMinimumHeight(1000)
+        self.interaction_table.setMinimumHeight(1000)
 
         from PyQt6.QtWidgets import QSizePolicy
-        self.ranking_table.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
-        self.ranking_table.itemDoubleClicked.connect(self.open_user_space_from_table)
+        self.interaction_table.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
+        self.interaction_table.itemDoubleClicked.connect(self.open_user_space_from_table)
 
 
         # 设置列宽 - 让表格占满页面
         from PyQt6.QtWidgets import QHeaderView
-        header = self.ranking_table.horizontalHeader()
+        header = self.interaction_table.horizontalHeader()
         header.setSectionResizeMode(0, QHeaderView.ResizeMode.Fixed)  # 排名固定宽度
         header.setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)  # UID自适应
         header.setSectionResizeMode(2, QHeaderView.ResizeMode.Fixed)  # 收到消息固定
         header.setSectionResizeMode(3, QHeaderView.ResizeMode.Fixed)  # 发送消息固定
         header.setSectionResizeMode(4, QHeaderView.ResizeMode.Fixed)  # 总互动固定
 
-        self.ranking_table.setColumnWidth(0, 80)  # 排名
-        self.ranking_table.setColumnWidth(2, 120)  # 收到消息
-        self.ranking_table.setColumnWidth(3, 120)  # 发送消息
-        self.ranking_table.setColumnWidth(4, 120)  # 总互动次数
+        self.interaction_table.setColumnWidth(0, 80)  # 排名
+        self.interaction_table.setColumnWidth(2, 120)  # 收到消息
+        self.interaction_table.setColumnWidth(3, 120)  # 发送消息
+        self.interaction_table.setColumnWidth(4, 120)  # 总互动次数
         # 确保表头显示并设置属性
-        self.ranking_table.horizontalHeader().setVisible(True)
-        self.ranking_table.horizontalHeader().setStretchLastSection(False)
-        self.ranking_table.horizontalHeader().setHighlightSections(True)
-        self.ranking_table.verticalHeader().setVisible(False)
+        self.interaction_table.horizontalHeader().setVisible(True)
+        self.interaction_table.horizontalHeader().setStretchLastSection(False)
+        self.interaction_table.horizontalHeader().setHighlightSections(True)
+        self.interaction_table.verticalHeader().setVisible(False)
         # 禁止编辑
-        self.ranking_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
-        self.ranking_table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.interaction_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.interaction_table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
 
         # 加载排行榜数据
-        self.load_interaction_ranking()
+        self.load_interaction_ranking(ranking)
 
         ranking_layout.addWidget(QLabel("双击用户查看B站主页,排名"))
-        ranking_layout.addWidget(self.ranking_table)
+        ranking_layout.addWidget(self.interaction_table)
 
         ranking_card.layout().addLayout(ranking_layout)
         layout.addWidget(ranking_card)
 
         layout.addStretch()
 
-    def get_message_stats(self):
-        """获取私信统计数据"""
-        try:
-            import pickle
-            import os
-            from datetime import datetime
-            from collections import Counter
-
-            # 尝试从缓存文件读取私信数据
-            home_dir = os.path.expanduser("~")
-            cache_file = os.path.join(home_dir, ".bilibili_tools", "message_cache.pkl")
-
-            if not os.path.exists(cache_file):
-                return {}
-
-            with open(cache_file, 'rb') as f:
-                data = pickle.load(f)
-                messages = data.get('messages', [])
-
-            if not messages:
-                return {}
-
-            # 计算统计数据
-            total_messages = len(messages)
-            conversations = set(msg['talker_id'] for msg in messages)
-            total_conversations = len(conversations)
-
-            # 计算未读消息
-            unread_messages = sum(1 for msg in messages if msg.get('is_unread', False))
-
-            # 计算今日消息
-            today = datetime.now().date()
-            today_messages = 0
-            for msg in messages:
-                try:
-                    ts = msg['timestamp']
-                    if ts > 1e10:  # 毫秒级时间戳
-                        ts = ts / 1000
-                    msg_date = datetime.fromtimestamp(ts).date()
-                    if msg_date == today:
-                        today_messages += 1
-                except:
-                    continue
-
-            # 计算时间范围
-            try:
-                timestamps = [msg['timestamp'] for msg in messages]
-                timestamps = [ts / 1000 if ts > 1e10 else ts for ts in timestamps]
-                earliest = min(timestamps)
-                latest = max(timestamps)
-                date_range = f"{datetime.fromtimestamp(earliest).strftime('%Y-%m-%d')} 至 {datetime.fromtimestamp(latest).strftime('%Y-%m-%d')}"
-            except:
-                date_range = "无数据"
-
-            # 找出最活跃的用户
-            talker_counter = Counter(msg['talker_id'] for msg in messages)
-            if talker_counter:
-                most_active_uid, most_active_count = talker_counter.most_common(1)[0]
-                most_active_user = f"UID:{most_active_uid} ({most_active_count}条)"
-            else:
-                most_active_user = "无数据"
-
-            # 计算日均消息数
-            try:
-                days_span = (latest - earliest) / (24 * 3600)
-                avg_daily = total_messages / max(days_span, 1)
-            except:
-                avg_daily = 0
-
-            # 缓存时间
-            cache_time = datetime.fromtimestamp(os.path.getmtime(cache_file)).strftime('%Y-%m-%d %H:%M:%S')
-
-            return {
-                'total_messages': total_messages,
-                'total_conversations': total_conversations,
-                'unread_messages': unread_messages,
-                'today_messages': today_messages,
-                'date_range': date_range,
-                'most_active_user': most_active_user,
-                'avg_daily_messages': avg_daily,
-                'cache_time': cache_time
-            }
-
-        except Exception as e:
-            logger.error(f"获取私信统计数据失败: {e}")
-            return {}
-
-    def load_interaction_ranking(self):
-        """加载互动排行榜"""
-        try:
-            import pickle
-            import os
-            from collections import defaultdict
-
-            # 尝试从缓存文件读取私信数据
-            home_dir = os.path.expanduser("~")
-            cache_file = os.path.join(home_dir, ".bilibili_tools", "message_cache.pkl")
-
-            if not os.path.exists(cache_file):
-                self.ranking_table.setRowCount(1)
-                no_data_item = QTableWidgetItem(" 暂无私信数据")
-                no_data_item.setData(Qt.ItemDataRole.UserRole, None)
-                self.ranking_table.setItem(0, 0, no_data_item)
-                self.ranking_table.setSpan(0, 0, 1, 5)  # 合并所有5列
-                return
-
-            with open(cache_file, 'rb') as f:
-                data = pickle.load(f)
-                messages = data.get('messages', [])
-
-            if not messages:
-                self.ranking_table.setRowCount(1)
-                no_data_item = QTableWidgetItem("暂无私信数据")
-                no_data_item.setData(Qt.ItemDataRole.UserRole, None)
-                self.ranking_table.setItem(0, 0, no_data_item)
-                self.ranking_table.setSpan(0, 0, 1, 5)
-                return
-
-            # 获取当前用户UID
-            current_uid = None
-            if self.api_service:
-                uid, _, _ = self.api_service.get_cached_user_info()
-                current_uid = uid
-
-            # 统计每个用户的互动次数
-            user_stats = defaultdict(lambda: {'sent': 0, 'received': 0})
-
-            for msg in messages:
-                talker_id = msg['talker_id']
-                sender_uid = msg['sender_uid']
+    def load_interaction_ranking(self, ranking):
+        """填充互动排行榜"""
+        if not ranking:
+            self.interaction_table.setRowCount(1)
+            no_data_item = QTableWidgetItem("暂无私信数据")
+            no_data_item.setData(Qt.ItemDataRole.UserRole, None)
+            self.interaction_table.setItem(0, 0, no_data_item)
+            self.interaction_table.setSpan(0, 0, 1, 5)  # 合并所有5列
+            return
 
-                if sender_uid == current_uid:
-                    # 当前用户发送的消息
-                    user_stats[talker_id]['sent'] += 1
+        # 先在GUI线程批量创建表格项（QTableWidgetItem只能在GUI线程创建），数值列直接存int
+        display_role = Qt.ItemDataRole.DisplayRole
+        user_role = Qt.ItemDataRole.UserRole
+        align_center = Qt.AlignmentFlag.AlignCenter
+        rows = []
+        for rank, uid, uid_text, received, sent, total in ranking:
+            row_items = []
+            for col, value in enumerate((rank, uid_text, received, sent, total)):
+                item = QTableWidgetItem()
+                item.setData(display_role, value)
+                if col == 1:
+                    item.setData(user_role, uid)
                 else:
-                    # 接收到的消息
-                    user_stats[talker_id]['received'] += 1
-
-            # 按总互动次数排序
-            sorted_users = sorted(
-                user_stats.items(),
-                key=lambda x: x[1]['sent'] + x[1]['received'],
-                reverse=True
-            )
-
-            # 设置表格行数（显示前30名）
-            display_count = min(30, len(sorted_users))
-            self.ranking_table.setRowCount(display_count)
-
-            # 填充数据
-            for i, (uid, stats) in enumerate(sorted_users[:display_count]):
-                total = stats['sent'] + stats['received']
-
-                # 排名
-                rank_item = QTableWidgetItem(str(i + 1))
-                rank_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-                self.ranking_table.setItem(i, 0, rank_item)
-
-                # UID
-                uid_item = QTableWidgetItem(f"UID: {uid}")
-                uid_item.setData(Qt.ItemDataRole.UserRole, uid)
-                self.ranking_table.setItem(i, 1, uid_item)
-
-                # 收到消息
-                received_item = QTableWidgetItem(str(stats['received']))
-                received_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-                self.ranking_table.setItem(i, 2, received_item)
-
-                # 发送消息
-                sent_item = QTableWidgetItem(str(stats['sent']))
-                sent_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-                self.ranking_table.setItem(i, 3, sent_item)
-
-                # 总互动次数
-                total_item = QTableWidgetItem(str(total))
-                total_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-                self.ranking_table.setItem(i, 4, total_item)
-
-
-        except Exception as e:
-            logger.error(f"加载互动排行榜失败: {e}")
-            self.ranking_table.setRowCount(1)
-            error_item = QTableWidgetItem(f"❌ 加载失败: {e}")
-            error_item.setData(Qt.ItemDataRole.UserRole, None)
-            self.ranking_table.setItem(0, 0, error_item)
-            self.ranking_table.setSpan(0, 0, 1, 5)
+                    item.setTextAlignment(align_center)
+                row_items.append(item)
+            rows.append(row_items)
+
+        # 批量填充期间暂停重绘、信号和排序，结束后统一刷新一次
+        table = self.interaction_table
+        sorting_enabled = table.isSortingEnabled()
+        table.setSortingEnabled(False)
+        table.setUpdatesEnabled(False)
+        table.blockSignals(True)
+        try:
+            table.setRowCount(len(rows))
+            for i, row_items in enumerate(rows):
+                for col, item in enumerate(row_items):
+                    table.setItem(i, col, item)
+        finally:
+            table.blockSignals(False)
+            table.setUpdatesEnabled(True)
+            table.setSortingEnabled(sorting_enabled)
 
     def open_user_space_from_table(self, item):
         """打开用户B站主页"""
@@ -921,7 +940,25 @@ class CommentStatsScreen(QWidget):
                 from PyQt6.QtWidgets import QMessageBox
                 QMessageBox.warning(self, "打开失败", f"无法打开用户主页: {e}")
 
+    def _detach_thread(self, thread):
+        """线程仍在运行（如正在读取缓存文件）时不再等待：断开结果信号，保留引用直到线程结束后由 Qt 删除"""
+        try:
+            thread.data_loaded.disconnect()
+            thread.error.disconnect()
+        except TypeError:
+            pass
+        CommentStatsScreen._detached_threads.add(thread)
+        thread.finished.connect(thread.deleteLater)
+        thread.destroyed.connect(lambda: CommentStatsScreen._detached_threads.discard(thread))
+        if thread.isFinished():  # 在 wait 超时后、连接信号前刚好结束
+            thread.deleteLater()
+
     def closeEvent(self, event):
         """窗口关闭时清理"""
+        if hasattr(self, 'message_loader_thread') and self.message_loader_thread.isRunning():
+            self.message_loader_thread.stop()
+            if not self.message_loader_thread.wait(2000):
+                self._detach_thread(self.message_loader_thread)
+
         self.window_closed.emit()
         super().closeEvent(event)
\ No newline at end of file
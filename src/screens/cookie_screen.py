@@ -28,12 +28,19 @@ class CookieScreen(QWidget):
         self.cookie_input = QLineEdit()
         self.cookie_input.setPlaceholderText("在这里输入cookie")
         self.cookie_input.setMinimumWidth(400)
+        # cookie很长，默认以密码模式显示，避免每次输入都重新排版整行文本
+        self.cookie_input.setEchoMode(QLineEdit.EchoMode.Password)
+        self.cookie_input.setMaxLength(4096)
         self.cookie_input.returnPressed.connect(self.on_submit)
 
+        self.show_cookie_checkbox = QCheckBox("显示")
+        self.show_cookie_checkbox.toggled.connect(self.on_show_cookie_toggled)
+
         self.submit_btn = QPushButton("确定")
         self.submit_btn.clicked.connect(self.on_submit)
 
         input_layout.addWidget(self.cookie_input)
+        input_layout.addWidget(self.show_cookie_checkbox)
         input_layout.addWidget(self.submit_btn)
 
         # AICU 复选框
@@ -61,6 +68,13 @@ class CookieScreen(QWidget):
 
         self.setLayout(layout)
 
+    def on_show_cookie_toggled(self, checked):
+        #切换cookie明文显示
+        if checked:
+            self.cookie_input.setEchoMode(QLineEdit.EchoMode.Normal)
+        else:
+            self.cookie_input.setEchoMode(QLineEdit.EchoMode.Password)
+
     def on_submit(self):
         #处理cookie提交
         cookie = self.cookie_input.text().strip()
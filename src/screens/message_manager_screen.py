@@ -1,5 +1,6 @@
 import threading
 import time
+import html
 import json
 import pickle
 import os
@@ -7,24 +8,64 @@ import random
 import webbrowser
 import re
 import requests
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime
-from collections import defaultdict, Counter
+from collections import defaultdict
+from bisect import bisect_right
+from functools import lru_cache
+from operator import itemgetter
 from typing import Dict, List, Optional, Any
 
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel,
-    QLineEdit, QTreeWidget, QTreeWidgetItem, QTextEdit, QTextBrowser,
+    QLineEdit, QTreeView, QPlainTextEdit, QTextBrowser,
     QCheckBox, QTabWidget, QFrame, QScrollArea, QMessageBox,
     QDialog, QSplitter, QHeaderView, QApplication
 )
-from PyQt6.QtCore import Qt, pyqtSignal, QTimer, QThread, pyqtSlot
-from PyQt6.QtGui import QFont, QTextCharFormat, QTextCursor, QColor
+from PyQt6.QtCore import (
+    Qt, pyqtSignal, QTimer, QThread, pyqtSlot, QAbstractTableModel, QModelIndex,
+    QItemSelection, QItemSelectionModel, QUrl
+)
+from PyQt6.QtGui import QFont, QTextCharFormat, QTextCursor, QColor, QBrush, QTextDocument, QDesktopServices
 
 from ..api.api_service import ApiService
 import logging
 
 logger = logging.getLogger(__name__)
 
+# 消息内容中的 http/https 链接，避免匹配中文
+_URL_PATTERN = re.compile(r'(https?://[^\s\u4e00-\u9fa5]+)')
+# 链接末尾可能粘连的标点符号
+_URL_TRAILING_PUNCT = '.,;!?。，；！？'
+
+
+def _url_to_anchor(match):
+    """_URL_PATTERN.sub 的替换函数：把匹配到的链接转成可点击的 <a> 标签"""
+    url = match.group(1).rstrip(_URL_TRAILING_PUNCT)
+    return f'<a href="{url}" style="color: cyan; text-decoration: underline;">{url}</a>'
+
+
+# 消息原始 content 的 JSON 解码结果按字符串缓存：同一条内容在解析显示文本、提取图片、判断视频推送时只解码一次。
+# 返回的对象是共享的，调用方只能读取，不能修改
+_load_content_json = lru_cache(maxsize=4096)(json.loads)
+
+# 视图每次重绘都会对每个单元格按多种角色调用 data()，角色常量提前取出，省去每次调用的枚举属性查找
+_DISPLAY_ROLE = Qt.ItemDataRole.DisplayRole
+_USER_ROLE = Qt.ItemDataRole.UserRole
+_FOREGROUND_ROLE = Qt.ItemDataRole.ForegroundRole
+_FONT_ROLE = Qt.ItemDataRole.FontRole
+
+
+@lru_cache(maxsize=1024)
+def _format_timestamp(ts):
+    """把秒级时间戳格式化为 'YYYY-MM-DD HH:MM:SS'（本地时间），直接拼接比 strftime 快。
+    同一秒内的连续消息、重复打开的对话会命中缓存"""
+    lt = time.localtime(ts)
+    return (f"{lt.tm_year:04d}-{lt.tm_mon:02d}-{lt.tm_mday:02d} "
+            f"{lt.tm_hour:02d}:{lt.tm_min:02d}:{lt.tm_sec:02d}")
+
 #成功了就减少延迟,失败了增加延迟
 class SmartDelay:
     def __init__(self):
@@ -47,23 +88,38 @@ class SmartDelay:
         self.burst_threshold = 10  # 每10个请求
         self.burst_delay = 3.0  # 强制延迟3秒
 
+        # 多个线程共用时，wait() 在锁内依次预约放行时刻，保证整体请求间隔不变；
+        # 睡眠在锁外进行，不会让其他线程卡在锁上。修改计数和配置的方法同样在锁内进行
+        self._lock = threading.Lock()
+
     def set_operation_type(self, operation_type):
         """设置当前操作类型"""
-        self.current_operation = operation_type
+        with self._lock:
+            self.current_operation = operation_type
 
     def set_message_count(self, count):
         """根据消息数量设置延迟因子"""
         if count <= 30:
-            self.message_count_factor = 1.0
+            factor = 1.0
         elif count <= 50:
-            self.message_count_factor = 1.2
+            factor = 1.2
         elif count <= 100:
-            self.message_count_factor = 1.5
+            factor = 1.5
         else:
             # 超过100条，延迟显著增加
-            self.message_count_factor = 2.0 + (count - 100) * 0.01
+            factor = 2.0 + (count - 100) * 0.01
+        with self._lock:
+            self.message_count_factor = factor
 
     def wait(self):
+        with self._lock:
+            release_time = self._reserve_slot()
+        sleep_time = release_time - time.monotonic()
+        if sleep_time > 0:
+            time.sleep(sleep_time)
+
+    def _reserve_slot(self):
+        """计算本次延迟并预约放行时刻，返回该时刻（time.monotonic() 时间）"""
         # 获取当前操作的基础延迟
         base_delay = self.base_delays.get(self.current_operation, 1.0)
 
@@ -80,7 +136,7 @@ class SmartDelay:
             delay *= self.message_count_factor
 
         # 添加随机性（±20%）
-        delay = random.uniform(delay * 0.8, delay * 1.2)
+        delay *= 0.8 + 0.4 * random.random()
 
         # 限制延迟范围
         min_delay = 0.3 if self.current_operation == 'session_list' else 0.5
@@ -92,32 +148,35 @@ class SmartDelay:
         if self.request_count % self.burst_threshold == 0:
             delay = max(delay, self.burst_delay)
 
-        # 确保与上次请求的间隔
+        # 确保与上一个放行时刻的间隔
+        now = time.monotonic()
         if self.last_request_time > 0:
-            time_since_last = time.time() - self.last_request_time
-            if time_since_last < delay:
-                time.sleep(delay - time_since_last)
+            release_time = max(now, self.last_request_time + delay)
         else:
-            time.sleep(delay)
+            release_time = now + delay
 
-        self.last_request_time = time.time()
+        self.last_request_time = release_time
+        return release_time
 
     def on_success(self):
         """请求成功时调用"""
-        self.success_count += 1
-        self.failure_count = max(0, self.failure_count - 2)  # 成功时快速恢复
+        with self._lock:
+            self.success_count += 1
+            self.failure_count = max(0, self.failure_count - 2)  # 成功时快速恢复
 
     def on_failure(self):
         """请求失败时调用"""
-        self.failure_count += 1
-        self.success_count = 0
+        with self._lock:
+            self.failure_count += 1
+            self.success_count = 0
 
     def reset(self):
         """重置延迟状态"""
-        self.failure_count = 0
-        self.success_count = 0
-        self.request_count = 0
-        self.last_request_time = 0
+        with self._lock:
+            self.failure_count = 0
+            self.success_count = 0
+            self.request_count = 0
+            self.last_request_time = 0
 
 class MessageCache:
     """消息缓存系统，支持断点续传"""
@@ -127,7 +186,17 @@ class MessageCache:
         self.last_fetch_time = 0
         self.last_processed_session_end_ts = 0
         self.newest_msg_timestamp = 0
+        self.newest_seqno = 0  # 已缓存消息中最大的 msg_seqno，随 add_messages 递增维护
         self.session_ack_seqnos = {}  # 存储每个会话的已读位置
+        # “获取新消息”时各会话分页（按 end_ts）的 ETag，用于条件请求；只保存在内存中，清空缓存时一并清空
+        self.session_page_etags = {}
+        # msg_seqno -> 消息 以及 talker_id -> 消息列表 两个索引，对应 _indexed_messages 这个列表对象；
+        # messages 被整体替换时自动重建
+        self._by_seqno = {}
+        self._by_talker = defaultdict(list)
+        self._indexed_messages = None
+        # 内存中的内容是否有尚未写盘的修改，没有修改时 save_if_dirty 直接跳过
+        self._dirty = False
         self._ensure_cache_dir()
         self.load_cache()
 
@@ -147,16 +216,32 @@ class MessageCache:
         if os.path.exists(self.cache_file):
             try:
                 with open(self.cache_file, 'rb') as f:
-                    data = pickle.load(f)
+                    # 一次性读入再反序列化，避免 pickle.load 逐块小读
+                    data = pickle.loads(f.read())
                     self.messages = data.get('messages', [])
                     self.last_fetch_time = data.get('last_fetch_time', 0)
                     self.last_processed_session_end_ts = data.get('last_processed_session_end_ts', 0)
                     self.newest_msg_timestamp = data.get('newest_msg_timestamp', 0)
+                    self.newest_seqno = data.get('newest_seqno', 0)
                     self.session_ack_seqnos = data.get('session_ack_seqnos', {})
 
+                    # 同一个UID在反序列化后是各自独立的对象，合并成共享引用以减少内存占用
+                    uid_pool = {}
+                    for msg in self.messages:
+                        talker_id = msg['talker_id']
+                        msg['talker_id'] = uid_pool.setdefault(talker_id, talker_id)
+                        sender_uid = msg['sender_uid']
+                        msg['sender_uid'] = uid_pool.setdefault(sender_uid, sender_uid)
+
+                    # 旧版缓存未保证顺序，加载时统一排成时间倒序（已有序时只需一次线性扫描）
+                    self.messages.sort(key=itemgetter('timestamp'), reverse=True)
+
                     # 如果没有记录最新消息时间戳，从现有消息中找出
                     if not self.newest_msg_timestamp and self.messages:
-                        self.newest_msg_timestamp = max(msg['timestamp'] for msg in self.messages)
+                        self.newest_msg_timestamp = self.messages[0]['timestamp']
+                    # 旧版缓存没有保存最大 seqno，只在加载时补算一次
+                    if not self.newest_seqno and self.messages:
+                        self.newest_seqno = max(msg['msg_seqno'] for msg in self.messages)
             except Exception as e:
                 logger.error(f"加载缓存失败: {e}")
 
@@ -168,39 +253,94 @@ class MessageCache:
                 'last_fetch_time': self.last_fetch_time,
                 'last_processed_session_end_ts': self.last_processed_session_end_ts,
                 'newest_msg_timestamp': self.newest_msg_timestamp,
+                'newest_seqno': self.newest_seqno,
                 'session_ack_seqnos': self.session_ack_seqnos
             }
-            with open(self.cache_file, 'wb') as f:
-                pickle.dump(data, f)
+            payload = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+            # 先写临时文件再替换，保存中途退出也不会损坏已有缓存
+            tmp_file = self.cache_file + ".tmp"
+            with open(tmp_file, 'wb') as f:
+                f.write(payload)
+                # 落盘后再替换，断电时也不会留下内容不完整的缓存文件
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.cache_file)
+            self._dirty = False
         except Exception as e:
             logger.error(f"保存缓存失败: {e}")
 
+    def mark_dirty(self):
+        """标记缓存有未保存的修改（外部直接改动消息或字段后调用）"""
+        self._dirty = True
+
+    def save_if_dirty(self):
+        """只有存在未保存的修改时才写盘"""
+        if self._dirty:
+            self.save_cache()
+
+    def _ensure_indexes(self):
+        """messages 列表被替换过时重建 seqno/会话索引"""
+        if self._indexed_messages is not self.messages:
+            self._by_seqno = {}
+            self._by_talker = defaultdict(list)
+            for msg in self.messages:
+                self._by_seqno[msg['msg_seqno']] = msg
+                self._by_talker[msg['talker_id']].append(msg)
+            self._indexed_messages = self.messages
+
     def add_messages(self, new_messages, update_newest=True):
         """添加新消息，自动去重"""
-        existing_seqnos = {msg['msg_seqno'] for msg in self.messages}
+        self._ensure_indexes()
+        by_seqno = self._by_seqno
+        by_talker = self._by_talker
         added_count = 0
         for msg in new_messages:
-            if msg['msg_seqno'] not in existing_seqnos:
+            if msg['msg_seqno'] not in by_seqno:
                 self.messages.append(msg)
-                existing_seqnos.add(msg['msg_seqno'])
+                by_seqno[msg['msg_seqno']] = msg
+                by_talker[msg['talker_id']].append(msg)
                 added_count += 1
+                if msg['msg_seqno'] > self.newest_seqno:
+                    self.newest_seqno = msg['msg_seqno']
                 # 更新最新消息时间戳
                 if update_newest and msg['timestamp'] > self.newest_msg_timestamp:
                     self.newest_msg_timestamp = msg['timestamp']
         self.last_fetch_time = time.time()
+        if added_count:
+            # 保持按时间倒序：原有部分已有序，Timsort 只需合并新追加的一段
+            self.messages.sort(key=itemgetter('timestamp'), reverse=True)
+            self._dirty = True
         return added_count
 
     def get_messages(self):
         """获取所有消息"""
         return self.messages
 
+    def get_message(self, msg_seqno):
+        """按 msg_seqno 查找消息，不存在时返回 None"""
+        self._ensure_indexes()
+        return self._by_seqno.get(msg_seqno)
+
+    def get_talker_messages(self, talker_id):
+        """获取与某个用户的全部消息（返回新列表）"""
+        self._ensure_indexes()
+        return list(self._by_talker.get(talker_id, ()))
+
+    def replace_messages(self, messages):
+        """整体替换消息列表（如删除会话后），同时重算最大 seqno"""
+        self.messages = messages
+        self.newest_seqno = max((msg['msg_seqno'] for msg in messages), default=0)
+        self._dirty = True
+
     def clear(self):
         """清空缓存"""
         self.messages = []
         self.last_fetch_time = 0
         self.last_processed_session_end_ts = 0
         self.newest_msg_timestamp = 0
+        self.newest_seqno = 0
         self.session_ack_seqnos = {}
+        self.session_page_etags = {}  # 缓存已清空，旧 ETag 会让服务端返回 304 而什么都取不到
         self.save_cache()
 
     def get_formatted_last_time(self):
@@ -218,7 +358,10 @@ class MessageCache:
 
     def update_session_ack_seqno(self, talker_id, ack_seqno):
         """更新会话的已读位置"""
-        self.session_ack_seqnos[str(talker_id)] = ack_seqno
+        key = str(talker_id)
+        if self.session_ack_seqnos.get(key) != ack_seqno:
+            self.session_ack_seqnos[key] = ack_seqno
+            self._dirty = True
 
     def get_session_ack_seqno(self, talker_id):
         """获取会话的已读位置"""
@@ -231,6 +374,9 @@ class MessageFetchThread(QThread):
     finished_signal = pyqtSignal()
     update_ui_signal = pyqtSignal()
 
+    # 同一页会话并发获取消息的线程数
+    SESSION_FETCH_WORKERS = 3
+
     def __init__(self, manager, fetch_type="all"):
         super().__init__()
         self.manager = manager
@@ -261,7 +407,8 @@ class MessageFetchThread(QThread):
         except Exception as e:
             self.log_signal.emit(f"获取消息过程中发生错误: {e}")
         finally:
-            self.manager.cache.save_cache()
+            # 无论是否出错都只在这里保存一次，没有改动时不写盘
+            self.manager.cache.save_if_dirty()
 
             if self.should_stop:
                 log_msg = f"消息获取已中止。本轮处理了 {sessions_processed} 个会话，进度已保存。"
@@ -284,8 +431,8 @@ class MessageFetchThread(QThread):
                 self.log_signal.emit("没有缓存消息，请先使用'获取全部'功能。")
                 return
 
-            # 找出最新的消息序列号
-            newest_seqno = max(msg['msg_seqno'] for msg in self.manager.messages)
+            # 最新的消息序列号由缓存增量维护，无需遍历全部消息
+            newest_seqno = self.manager.cache.newest_seqno
             self.log_signal.emit(f"开始获取新消息（最新缓存消息seqno: {newest_seqno}）...")
 
             # 获取会话列表
@@ -303,15 +450,23 @@ class MessageFetchThread(QThread):
                     if current_page_end_ts > 0:
                         params['end_ts'] = current_page_end_ts
 
-                    resp = requests.get(
+                    # 服务端给过 ETag 时带上条件请求，页面未变化会直接返回 304
+                    headers = None
+                    page_etag = self.manager.cache.session_page_etags.get(current_page_end_ts)
+                    if page_etag:
+                        headers = {'If-None-Match': page_etag}
+
+                    resp = self.manager.http.get(
                         f"{self.manager.api_base}/session_svr/v1/session_svr/get_sessions",
                         params=params,
-                        headers=self.manager.headers,
-                        cookies=self.manager.cookies,
+                        headers=headers,
                         timeout=15
                     )
+                    if resp.status_code == 304:
+                        self.log_signal.emit("会话列表自上次获取后没有变化")
+                        break
                     resp.raise_for_status()
-                    data = resp.json()
+                    data = json.loads(resp.content)
 
                     if data['code'] != 0:
                         self.log_signal.emit(f"获取会话列表失败: {data.get('message', '')}")
@@ -321,6 +476,7 @@ class MessageFetchThread(QThread):
                     if not sessions:
                         break
 
+                    page_complete = True  # 本页所有会话的新消息都已完整获取
                     for session in sessions:
                         talker_id = session['talker_id']
 
@@ -334,16 +490,22 @@ class MessageFetchThread(QThread):
                             # 切换到获取消息操作类型
                             self.manager.smart_delay.set_operation_type('fetch_messages')
                             # 获取该会话的新消息
-                            session_new_messages = self._fetch_session_new_messages(
+                            session_new_messages, session_ok = self._fetch_session_new_messages(
                                 talker_id,
                                 newest_seqno,
                                 current_ack_seqno
                             )
                             new_messages.extend(session_new_messages)
+                            page_complete = page_complete and session_ok
                             self.manager.smart_delay.wait()
                             # 切换回会话列表操作类型
                             self.manager.smart_delay.set_operation_type('session_list')
 
+                    # 本页所有会话都获取成功才记录 ETag，有会话出错或被中止的页面下次仍会完整重新获取
+                    etag = resp.headers.get('ETag')
+                    if etag and page_complete and not self.should_stop:
+                        self.manager.cache.session_page_etags[current_page_end_ts] = etag
+
                     current_page_end_ts = sessions[-1]['session_ts']
                     has_more = data['data'].get('has_more', False)
 
@@ -354,21 +516,22 @@ class MessageFetchThread(QThread):
             # 添加新消息到缓存
             if new_messages:
                 added_count = self.manager.cache.add_messages(new_messages)
-                self.manager.messages = self.manager.cache.get_messages()
-                self.manager.cache.save_cache()
                 self.log_signal.emit(f"获取到 {added_count} 条新消息")
-                self.update_ui_signal.emit()
+                # 列表刷新交给 on_fetch_finished，这里不再重复刷新一次
             else:
                 self.log_signal.emit("没有新消息")
+            # 新消息和会话已读位置的变化一起保存
+            self.manager.cache.save_if_dirty()
 
         except Exception as e:
             self.log_signal.emit(f"获取新消息失败: {e}")
 
     def _fetch_session_new_messages(self, talker_id, since_seqno, current_ack_seqno):
-        """获取特定会话中比指定序列号新的消息"""
+        """获取特定会话中比指定序列号新的消息，返回 (消息列表, 是否完整获取)"""
         new_messages = []
         has_more = True
         max_seqno = 0
+        ok = True
 
         while has_more and not self.should_stop:
             try:
@@ -382,15 +545,13 @@ class MessageFetchThread(QThread):
                 if max_seqno > 0:
                     params['max_seqno'] = max_seqno
 
-                resp = requests.get(
+                resp = self.manager.http.get(
                     f"{self.manager.api_base}/svr_sync/v1/svr_sync/fetch_session_msgs",
                     params=params,
-                    headers=self.manager.headers,
-                    cookies=self.manager.cookies,
                     timeout=10
                 )
                 resp.raise_for_status()
-                data = resp.json()
+                data = json.loads(resp.content)
 
                 if data['code'] == 0:
                     messages = data['data'].get('messages', [])
@@ -398,38 +559,30 @@ class MessageFetchThread(QThread):
 
                     for msg_json in messages:
                         if msg_json['msg_seqno'] > since_seqno:
-                            msg_data = {
-                                'msg_seqno': msg_json['msg_seqno'],
-                                'talker_id': talker_id,
-                                'timestamp': msg_json['timestamp'],
-                                'sender_uid': msg_json['sender_uid'],
-                                'content': self.manager._parse_message_content(msg_json),
-                                'raw_content': msg_json.get('content', ''),
-                                'msg_type': msg_json['msg_type'],
-                                'msg_status': msg_json.get('msg_status', 0),
-                                'is_unread': msg_json['msg_seqno'] > current_ack_seqno
-                            }
-
-                            if msg_json['msg_type'] == 2:
-                                image_url = self.manager._extract_image_url(msg_json)
-                                if image_url:
-                                    msg_data['image_url'] = image_url
-
-                            new_messages.append(msg_data)
+                            new_messages.append(self._build_message_record(talker_id, msg_json, current_ack_seqno))
                         else:
                             has_more = False
                             break
 
-                    if messages:
-                        max_seqno = messages[-1]['msg_seqno']
+                    if not messages:
+                        has_more = False
+                        break
+                    max_seqno = messages[-1]['msg_seqno']
+                    # 更早的消息 seqno 只会小于 max_seqno，若已不可能大于 since_seqno 就不再请求下一页
+                    if max_seqno <= since_seqno + 1:
+                        has_more = False
                 else:
+                    self.log_signal.emit(f"获取会话 {talker_id} 新消息失败: {data.get('message', '')}")
+                    ok = False
                     break
 
             except Exception as e:
                 self.log_signal.emit(f"获取会话 {talker_id} 新消息时出错: {e}")
+                ok = False
                 break
 
-        return new_messages
+        # 被中止时后面可能还有没取到的新消息
+        return new_messages, ok and not has_more
 
     def _fetch_all_session_pages(self):
         """获取所有会话分页"""
@@ -445,99 +598,125 @@ class MessageFetchThread(QThread):
 
         session_unread_info = {}
 
-        while has_more:
-            if self.should_stop:
-                self.log_signal.emit("检测到停止信号，中断获取会话分页。")
-                break
-
-            try:
-                # 设置操作类型为获取会话列表
-                self.manager.smart_delay.set_operation_type('session_list')
-                params = {
-                    'session_type': session_type,
-                    'group_fold': 1,
-                    'unfollow_fold': 0,
-                    'sort_rule': 2,
-                    'build': 0,
-                    'mobi_app': 'web',
-                    'size': page_size
-                }
-                if current_page_end_ts > 0:
-                    params['end_ts'] = current_page_end_ts
-
-                resp = requests.get(
-                    f"{self.manager.api_base}/session_svr/v1/session_svr/get_sessions",
-                    params=params,
-                    headers=self.manager.headers,
-                    cookies=self.manager.cookies,
-                    timeout=15
-                )
-                resp.raise_for_status()
-                data = resp.json()
-
-                if data['code'] != 0:
-                    self.log_signal.emit(f"获取会话列表失败: {data.get('message', 'Unknown error')} (Code: {data['code']})")
-                    has_more = False
+        with ThreadPoolExecutor(max_workers=self.SESSION_FETCH_WORKERS) as executor:
+            while has_more:
+                if self.should_stop:
+                    self.log_signal.emit("检测到停止信号，中断获取会话分页。")
                     break
 
-                sessions = data['data'].get('session_list', [])
-                has_more = data['data'].get('has_more', False)
+                try:
+                    # 设置操作类型为获取会话列表
+                    self.manager.smart_delay.set_operation_type('session_list')
+                    params = {
+                        'session_type': session_type,
+                        'group_fold': 1,
+                        'unfollow_fold': 0,
+                        'sort_rule': 2,
+                        'build': 0,
+                        'mobi_app': 'web',
+                        'size': page_size
+                    }
+                    if current_page_end_ts > 0:
+                        params['end_ts'] = current_page_end_ts
 
-                if not sessions:
-                    self.log_signal.emit("未获取到更多会话。")
-                    has_more = False
-                    break
+                    resp = self.manager.http.get(
+                        f"{self.manager.api_base}/session_svr/v1/session_svr/get_sessions",
+                        params=params,
+                        timeout=15
+                    )
+                    resp.raise_for_status()
+                    data = json.loads(resp.content)
 
-                total_sessions_fetched_this_run += len(sessions)
-                self.manager.cache.last_processed_session_end_ts = sessions[-1]['session_ts']
-                current_page_end_ts = self.manager.cache.last_processed_session_end_ts
+                    if data['code'] != 0:
+                        self.log_signal.emit(f"获取会话列表失败: {data.get('message', 'Unknown error')} (Code: {data['code']})")
+                        has_more = False
+                        break
 
-                self.log_signal.emit(f"获取到 {len(sessions)} 个会话，下一页将从 ts: {current_page_end_ts} 开始。")
+                    sessions = data['data'].get('session_list', [])
+                    has_more = data['data'].get('has_more', False)
 
-                for session in sessions:
-                    if self.should_stop:
+                    if not sessions:
+                        self.log_signal.emit("未获取到更多会话。")
+                        has_more = False
                         break
 
+                    total_sessions_fetched_this_run += len(sessions)
+                    self.manager.cache.last_processed_session_end_ts = sessions[-1]['session_ts']
+                    self.manager.cache.mark_dirty()
+                    current_page_end_ts = self.manager.cache.last_processed_session_end_ts
+
+                    self.log_signal.emit(f"获取到 {len(sessions)} 个会话，下一页将从 ts: {current_page_end_ts} 开始。")
+
                     # 设置操作类型为获取消息
                     self.manager.smart_delay.set_operation_type('fetch_messages')
 
-                    # 保存会话的未读信息
-                    talker_id = session['talker_id']
-                    session_unread_info[talker_id] = {
-                        'unread_count': session.get('unread_count', 0),
-                        'ack_seqno': session.get('ack_seqno', 0)
-                    }
+                    # 本页会话并发获取；每个请求前仍经过 SmartDelay 排队，请求频率不变，只是请求耗时与等待重叠
+                    futures = []
+                    for session in sessions:
+                        if self.should_stop:
+                            break
 
-                    # 获取会话消息
-                    messages_from_session = self._fetch_single_session_messages_with_status(
-                        talker_id,
-                        session_unread_info[talker_id]
-                    )
-                    new_messages_this_run.extend(messages_from_session)
-                    self.manager.smart_delay.wait()
+                        # 保存会话的未读信息
+                        talker_id = session['talker_id']
+                        session_unread_info[talker_id] = {
+                            'unread_count': session.get('unread_count', 0),
+                            'ack_seqno': session.get('ack_seqno', 0)
+                        }
+                        futures.append(executor.submit(self._paced_fetch_session_messages,
+                                                       talker_id, session_unread_info[talker_id]))
 
-                if self.should_stop:
-                    break
+                    # 按会话顺序收集结果
+                    for future in futures:
+                        new_messages_this_run.extend(future.result())
 
-                self.manager.smart_delay.set_operation_type('session_list')
-                self.manager.smart_delay.on_success()
-                self.manager.smart_delay.wait()
+                    if self.should_stop:
+                        break
 
-            except Exception as e:
-                self.log_signal.emit(f"获取会话列表时发生错误: {e}")
-                has_more = False
-                break
+                    self.manager.smart_delay.set_operation_type('session_list')
+                    self.manager.smart_delay.on_success()
+                    self.manager.smart_delay.wait()
+
+                except Exception as e:
+                    self.log_signal.emit(f"获取会话列表时发生错误: {e}")
+                    has_more = False
+                    break
 
-        # 添加新消息到缓存
+        # 添加新消息到缓存，由 _fetch_all_messages 统一保存
         self.manager.cache.add_messages(new_messages_this_run)
-        self.manager.messages = self.manager.cache.get_messages()
-        self.manager.cache.save_cache()
 
         if not self.should_stop and not has_more:
             self.log_signal.emit("已拉取完所有符合条件的会话。")
 
         return total_sessions_fetched_this_run
 
+    def _build_message_record(self, talker_id, msg_json, ack_seqno):
+        """把接口返回的消息转换成缓存中的消息记录（字典格式，与缓存文件、统计页面共用）"""
+        msg_type = msg_json['msg_type']
+        msg_data = {
+            'msg_seqno': msg_json['msg_seqno'],
+            'talker_id': talker_id,
+            'timestamp': msg_json['timestamp'],
+            'sender_uid': msg_json['sender_uid'],
+            'content': self.manager._parse_message_content(msg_json),
+            'raw_content': msg_json.get('content', ''),
+            'msg_type': msg_type,
+            'msg_status': msg_json.get('msg_status', 0),
+            'is_unread': msg_json['msg_seqno'] > ack_seqno
+        }
+
+        if msg_type == 2:
+            image_url = self.manager._extract_image_url(msg_json)
+            if image_url:
+                msg_data['image_url'] = image_url
+        return msg_data
+
+    def _paced_fetch_session_messages(self, talker_id, unread_info):
+        """在线程池中执行：先等待 SmartDelay 放行，再获取会话消息"""
+        if self.should_stop:
+            return []
+        self.manager.smart_delay.wait()
+        return self._fetch_single_session_messages_with_status(talker_id, unread_info)
+
     def _fetch_single_session_messages_with_status(self, talker_id, unread_info):
         """获取单个会话的消息，并标记未读状态"""
         if self.should_stop:
@@ -561,39 +740,20 @@ class MessageFetchThread(QThread):
             if self.manager.messages_per_session > 100:
                 self.log_signal.emit(f"正在获取会话 {talker_id} 的消息（最多 {self.manager.messages_per_session} 条）...")
 
-            resp = requests.get(
+            resp = self.manager.http.get(
                 f"{self.manager.api_base}/svr_sync/v1/svr_sync/fetch_session_msgs",
                 params=params,
-                headers=self.manager.headers,
-                cookies=self.manager.cookies,
                 timeout=10
             )
             resp.raise_for_status()
-            data = resp.json()
+            data = json.loads(resp.content)
 
             if data['code'] == 0:
                 for msg_json in data['data'].get('messages', []):
                     if self.should_stop:
                         break
 
-                    msg_data = {
-                        'msg_seqno': msg_json['msg_seqno'],
-                        'talker_id': talker_id,
-                        'timestamp': msg_json['timestamp'],
-                        'sender_uid': msg_json['sender_uid'],
-                        'content': self.manager._parse_message_content(msg_json),
-                        'raw_content': msg_json.get('content', ''),
-                        'msg_type': msg_json['msg_type'],
-                        'msg_status': msg_json.get('msg_status', 0),
-                        'is_unread': msg_json['msg_seqno'] > ack_seqno
-                    }
-
-                    if msg_json['msg_type'] == 2:
-                        image_url = self.manager._extract_image_url(msg_json)
-                        if image_url:
-                            msg_data['image_url'] = image_url
-
-                    messages_for_this_session.append(msg_data)
+                    messages_for_this_session.append(self._build_message_record(talker_id, msg_json, ack_seqno))
                 self.manager.smart_delay.on_success()
             else:
                 self.log_signal.emit(f"获取会话 {talker_id} 消息失败: {data.get('message', '')}")
@@ -661,15 +821,13 @@ class OperationThread(QThread):
                     'csrf_token': self.manager.cookies['bili_jct'],
                     'csrf': self.manager.cookies['bili_jct']
                 }
-                resp = requests.post(
+                resp = self.manager.http.post(
                     f"{self.manager.api_base}/session_svr/v1/session_svr/update_ack",
                     data=data,
-                    headers=self.manager.headers,
-                    cookies=self.manager.cookies,
                     timeout=10
                 )
                 resp.raise_for_status()
-                result = resp.json()
+                result = json.loads(resp.content)
                 if result['code'] == 0:
                     self.log_signal.emit(f"成功标记 UID:{talker_id} 会话已读 (至 seqno:{ack_seqno})")
                     success_count += 1
@@ -678,9 +836,11 @@ class OperationThread(QThread):
                     self.manager.cache.update_session_ack_seqno(talker_id, ack_seqno)
 
                     # 更新本地消息的未读状态
-                    for msg in self.manager.messages:
-                        if msg['talker_id'] == talker_id and msg['msg_seqno'] <= ack_seqno:
+                    # 借助缓存的会话索引，只遍历该会话的消息
+                    for msg in self.manager.cache.get_talker_messages(talker_id):
+                        if msg['msg_seqno'] <= ack_seqno and msg['is_unread']:
                             msg['is_unread'] = False
+                            self.manager.cache.mark_dirty()
 
                     self.manager.smart_delay.on_success()
                 else:
@@ -694,8 +854,8 @@ class OperationThread(QThread):
                 self.manager.smart_delay.on_failure()
                 processed_count += 1
 
-        # 保存更新后的缓存
-        self.manager.cache.save_cache()
+        # 整轮结束后统一保存一次，全部失败时不写盘
+        self.manager.cache.save_if_dirty()
         self.update_ui_signal.emit()
 
         unprocessed_count = total_to_process - processed_count
@@ -726,15 +886,13 @@ class OperationThread(QThread):
                     'csrf_token': self.manager.cookies['bili_jct'],
                     'csrf': self.manager.cookies['bili_jct']
                 }
-                resp = requests.post(
+                resp = self.manager.http.post(
                     f"{self.manager.api_base}/session_svr/v1/session_svr/remove_session",
                     data=data,
-                    headers=self.manager.headers,
-                    cookies=self.manager.cookies,
                     timeout=10
                 )
                 resp.raise_for_status()
-                result = resp.json()
+                result = json.loads(resp.content)
                 if result['code'] == 0:
                     self.log_signal.emit(f"API: 成功删除与 UID:{talker_id} 的会话。")
                     deleted_count_api += 1
@@ -762,20 +920,152 @@ class OperationThread(QThread):
 
         if successfully_deleted_ids:
             # 只删除成功删除的会话对应的消息
-            self.manager.messages = [m for m in self.manager.messages if m['talker_id'] not in successfully_deleted_ids]
-            self.manager.cache.messages = self.manager.messages
+            deleted_set = set(successfully_deleted_ids)
+            self.manager.cache.replace_messages(
+                [m for m in self.manager.messages if m['talker_id'] not in deleted_set]
+            )
             self.manager.cache.save_cache()
             self.log_signal.emit(f"本地消息列表已更新，删除了 {len(successfully_deleted_ids)} 个会话的消息。")
 
         self.update_ui_signal.emit()
 
 
+class MessageSearchThread(QThread):
+    """在后台线程执行消息搜索：按需构建搜索索引并查找匹配的消息"""
+    result_ready = pyqtSignal(int, object, object, object)  # generation, (消息列表, 长度), 匹配的消息, 搜索索引
+
+    def __init__(self, generation, source, messages, search_index, keyword, search_content, search_uid,
+                 uid_prefix):
+        super().__init__()
+        self.generation = generation
+        self.source = source  # 发起搜索时的 (消息列表, 长度)，用于判断索引能否缓存
+        self.messages = messages  # 消息列表的快照，获取线程追加消息不会影响本次搜索
+        self.search_index = search_index
+        self.keyword = keyword
+        self.search_content, self.search_uid = search_content, search_uid
+        self.uid_prefix = uid_prefix
+
+    def run(self):
+        try:
+            index = self.search_index or MessageManagerScreen.build_search_index(self.messages)
+            content_joined, uid_joined = index
+            # 在拼接好的整串上用 str.find 跳着查找，逐条比较的循环只剩命中的消息
+            hits = set()
+            if self.search_content:
+                MessageManagerScreen._find_in_joined(content_joined, self.keyword.casefold(), hits)
+            if self.search_uid:
+                if self.uid_prefix:
+                    MessageManagerScreen._find_prefix_in_joined(uid_joined, self.keyword, hits)
+                else:
+                    MessageManagerScreen._find_in_joined(uid_joined, self.keyword, hits)
+            # 命中的下标只在这里换成消息字典：缓存列表会被获取线程追加并原地排序，保存下标在之后会指向别的消息
+            matched = [self.messages[i] for i in sorted(hits)]
+            self.result_ready.emit(self.generation, self.source, matched, index)
+        except Exception as e:
+            logger.error(f"搜索消息失败: {e}")
+
+
+class MessageListModel(QAbstractTableModel):
+    """消息列表的数据模型，只保存当前显示的消息，单元格文本和样式由视图按需获取"""
+    HEADERS = ("时间", "发送者", "内容概要", "状态")
+
+    def __init__(self, row_formatter, parent=None):
+        super().__init__(parent)
+        self.rows: List[dict] = []
+        # msg -> (四列文本, 是否为折叠的视频推送)，只对实际绘制到的行调用
+        self._row_formatter = row_formatter
+        # msg_seqno -> ((msg_status, is_unread), 四列文本, 是否折叠)，状态变化后自动重新生成
+        self._row_cache: Dict[int, tuple] = {}
+        # 行样式只创建一次，所有行共用
+        self._unread_font = QFont()
+        self._unread_font.setBold(True)
+        self._unread_brush = QBrush(QColor(240, 230, 140))
+        self._recalled_brush = QBrush(Qt.GlobalColor.gray)
+
+    def set_rows(self, rows: List[dict]):
+        """替换显示的行：行和顺序都没变时只通知重绘（保留选中和滚动位置），否则重置模型"""
+        old_rows = self.rows
+        if len(rows) == len(old_rows) and all(new is old for new, old in zip(rows, old_rows)):
+            if rows:
+                self.dataChanged.emit(self.index(0, 0), self.index(len(rows) - 1, len(self.HEADERS) - 1))
+            return
+        self.beginResetModel()
+        self.rows = rows
+        self.endResetModel()
+
+    def prune_cache(self, messages: List[dict]):
+        """丢弃已不在消息列表中的行缓存"""
+        if len(self._row_cache) > len(messages):
+            alive = {msg['msg_seqno'] for msg in messages}
+            self._row_cache = {seqno: row for seqno, row in self._row_cache.items() if seqno in alive}
+
+    def _row(self, msg: dict) -> tuple:
+        seqno = msg['msg_seqno']
+        state = (msg.get('msg_status', 0), msg.get('is_unread', False))
+        row = self._row_cache.get(seqno)
+        if row is None or row[0] != state:
+            try:
+                texts, is_collapsed_video = self._row_formatter(msg)
+            except Exception as e:
+                logger.error(f"显示消息时出错: {e}")
+                texts, is_collapsed_video = ("", "", "", ""), False
+            row = self._row_cache[seqno] = (state, texts, is_collapsed_video)
+        return row
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=_DISPLAY_ROLE):
+        # 视图查询的角色大多用不到，先排除，避免取行和解析状态
+        if role not in (_DISPLAY_ROLE, _USER_ROLE, _FOREGROUND_ROLE, _FONT_ROLE) or not index.isValid():
+            return None
+        msg = self.rows[index.row()]
+
+        if role == _DISPLAY_ROLE:
+            return self._row(msg)[1][index.column()]
+        if role == _USER_ROLE:
+            column = index.column()
+            if column == 0:
+                return msg['msg_seqno']
+            if column == 1:
+                return self._row(msg)[2]  # 是否为折叠的视频推送
+            return None
+        if role == _FOREGROUND_ROLE:
+            if msg.get('msg_status', 0) in (1, 2):  # 撤回的消息
+                return self._recalled_brush
+            if msg.get('is_unread', False):  # 未读消息，橙色加粗
+                return self._unread_brush
+            return None
+        if role == _FONT_ROLE:
+            if msg.get('is_unread', False) and msg.get('msg_status', 0) not in (1, 2):
+                return self._unread_font
+            return None
+        return None
+
+
 class MessageManagerScreen(QWidget):
     """Bilibili 私信管理工具主界面"""
 
     back_to_tools = pyqtSignal()
     window_closed = pyqtSignal()
 
+    # 消息状态码对应的显示文本
+    MESSAGE_STATUS_TEXT = {
+        0: "正常",
+        1: "已撤回",
+        2: "系统撤回",
+        4: "发送中",
+        50: "无效图片"
+    }
+
     def __init__(self, api_service: ApiService):
         super().__init__()
         self.api_service = api_service
@@ -791,19 +1081,57 @@ class MessageManagerScreen(QWidget):
         self.cookies = {}
         if api_service:
             self._setup_cookies()
+        # 各线程共用的HTTP会话，复用连接避免每个请求重新握手
+        self.http = self._create_http_session()
 
         # 初始化其他组件
         self.cache = MessageCache()
-        self.messages = self.cache.get_messages()
         self.filtered_messages = []  # 用于搜索过滤
+        # (消息列表, 长度, 拼接后的搜索串)，列表被替换或长度变化时重建；不写入消息字典以免进入磁盘缓存
+        self._search_index = None
+        # (消息列表, 长度, 折叠视频推送后的显示列表)，与搜索索引同样的失效条件；清除搜索时直接复用
+        self._collapsed_rows = None
+        self._search_gen = 0  # 每次搜索加一，只应用最新一次搜索的结果
+        self._search_keyword = ""
+        self._search_threads = set()
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(150)
+        # 输入时触发的搜索不写日志，只有回车或点击搜索按钮时才记录
+        self._search_timer.timeout.connect(lambda: self.search_messages(explicit=False))
+        self._search_explicit = False  # 最近一次搜索是否由回车/按钮触发
+        # 日志缓冲
+        self._log_buffer = []
+        self._log_timer = QTimer(self)
+        self._log_timer.setSingleShot(True)
+        self._log_timer.setInterval(100)
+        self._log_timer.timeout.connect(self._flush_log)
+        # 类型11消息是否为视频推送：msg_seqno -> bool，原始内容不会变，只解析一次
+        self._video_push_flags = {}
+        # sender_uid -> "UID: xxx"，同一发送者的消息共用一个显示字符串
+        self._uid_display_cache = {}
         self.smart_delay = SmartDelay()
 
+        # 消息类型处理器
+        self._content_parsers = {
+            1: self._parse_text_message,
+            2: self._parse_image_message,
+            3: self._parse_video_message,
+            4: self._parse_emoticon_message,
+            5: self._parse_recall_message,
+            6: self._parse_share_message,
+            7: self._parse_audio_message,
+            10: self._parse_official_message,
+            11: self._parse_notification_message,
+            18: self._parse_interactive_message,
+        }
+        # 解析结果只取决于消息类型和原始内容，表情、系统通知等大量重复的内容只解析一次
+        self._parse_content_cached = lru_cache(maxsize=4096)(self._parse_content)
+
         # 添加消息获取配置
         self.messages_per_session = 30
         self.min_messages_per_session = 1
         self.max_messages_per_session = 200
-        # 统计数据
-        self.stats_data = defaultdict(lambda: {'sent': 0, 'received': 0, 'total': 0})
 
         # 线程管理
         self.fetch_thread = None
@@ -814,6 +1142,11 @@ class MessageManagerScreen(QWidget):
 
         logger.info("私信管理界面初始化完成")
 
+    @property
+    def messages(self):
+        """当前缓存的全部消息，始终就是 cache.messages 本身，不做拷贝"""
+        return self.cache.messages
+
     def _setup_cookies(self):
         """设置cookies"""
         try:
@@ -830,6 +1163,17 @@ class MessageManagerScreen(QWidget):
         except Exception as e:
             logger.error(f"设置cookies失败: {e}")
 
+    def _create_http_session(self) -> requests.Session:
+        """创建带连接池的HTTP会话，请求头和cookies只设置一次"""
+        session = requests.Session()
+        # 只对连接失败重试，响应层面的失败交给 SmartDelay 处理
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8,
+                              max_retries=Retry(total=3, read=0, status=0, backoff_factor=0.5))
+        session.mount("https://", adapter)
+        session.headers.update(self.headers)
+        session.cookies.update(self.cookies)
+        return session
+
     def init_ui(self):
         """初始化UI"""
         layout = QVBoxLayout(self)
@@ -857,37 +1201,25 @@ class MessageManagerScreen(QWidget):
 
         # 标题
         title_label = QLabel("私信管理工具")
-        title_label.setStyleSheet("font-size: 18px; font-weight: bold; color: #ecf0f1;")
+        title_label.setObjectName("messageManagerTitle")
         toolbar_layout.addWidget(title_label)
 
         toolbar_layout.addStretch()
 
         # 设置标签
         msg_limit_label = QLabel("每个会话获取:")
-        msg_limit_label.setStyleSheet("color: #ecf0f1; font-size: 18px;")
+        msg_limit_label.setObjectName("messageLimitLabel")
         toolbar_layout.addWidget(msg_limit_label)
         # 数量输入框
         self.msg_limit_input = QLineEdit()
         self.msg_limit_input.setText(str(self.messages_per_session))
         self.msg_limit_input.setMaximumWidth(60)
-        self.msg_limit_input.setStyleSheet("""
-            QLineEdit {
-                background-color: #34495e;
-                color: white;
-                border: 1px solid #7f8c8d;
-                padding: 6px;
-                border-radius: 12px;
-                font-size: 12px;
-            }
-            QLineEdit:focus {
-                border: 1px solid #3498db;
-            }
-        """)
+        self.msg_limit_input.setObjectName("messageLimitInput")
         toolbar_layout.addWidget(self.msg_limit_input)
 
         # 单位标签
         msg_unit_label = QLabel("条")
-        msg_unit_label.setStyleSheet("color: #ecf0f1; font-size: 18px;")
+        msg_unit_label.setObjectName("messageLimitLabel")
         toolbar_layout.addWidget(msg_unit_label)
 
         # 应用按钮
@@ -992,15 +1324,17 @@ class MessageManagerScreen(QWidget):
 
         self.search_entry = QLineEdit()
         self.search_entry.setPlaceholderText("搜索消息内容或UID...")
-        self.search_entry.returnPressed.connect(self.search_messages)
+        self.search_entry.returnPressed.connect(lambda: self.search_messages())
+        # 边输入边搜索：连续输入只在停顿150ms后搜索一次
+        self.search_entry.textChanged.connect(lambda _text: self._search_timer.start())
         search_layout.addWidget(self.search_entry)
 
         search_btn = QPushButton("搜索")
-        search_btn.clicked.connect(self.search_messages)
+        search_btn.clicked.connect(lambda: self.search_messages())
         search_layout.addWidget(search_btn)
 
         clear_search_btn = QPushButton("清除")
-        clear_search_btn.clicked.connect(self.clear_search)
+        clear_search_btn.clicked.connect(lambda: self.clear_search())
         search_layout.addWidget(clear_search_btn)
 
         self.search_content_cb = QCheckBox("内容")
@@ -1011,18 +1345,28 @@ class MessageManagerScreen(QWidget):
         self.search_uid_cb.setChecked(True)
         search_layout.addWidget(self.search_uid_cb)
 
+        # 输入的通常是UID开头几位，按前缀匹配能排除大量只是中间含有这几位数字的UID
+        self.uid_prefix_cb = QCheckBox("UID前缀匹配")
+        self.uid_prefix_cb.setChecked(True)
+        search_layout.addWidget(self.uid_prefix_cb)
+
         left_layout.addWidget(search_frame)
 
         # 消息列表
         list_label = QLabel(f"消息列表 (双击查看完整对话) - 共 {len(self.messages)} 条")
-        list_label.setStyleSheet("font-weight: bold; color: #ecf0f1; padding: 5px;")
+        list_label.setObjectName("messageSectionLabel")
         left_layout.addWidget(list_label)
         self.list_label = list_label
 
-        self.message_tree = QTreeWidget()
-        self.message_tree.setHeaderLabels(["时间", "发送者", "内容概要", "状态"])
-        self.message_tree.setSelectionMode(QTreeWidget.SelectionMode.ExtendedSelection)
-        self.message_tree.itemDoubleClicked.connect(self.show_conversation_details)
+        # 模型只保存当前显示的消息，单元格文本和样式在绘制时按需生成
+        self.message_model = MessageListModel(self._format_message_row, self)
+        self.message_tree = QTreeView()
+        self.message_tree.setModel(self.message_model)
+        self.message_tree.setSelectionMode(QTreeView.SelectionMode.ExtendedSelection)
+        self.message_tree.setSelectionBehavior(QTreeView.SelectionBehavior.SelectRows)
+        # 所有行都是单行文本，统一行高可省去逐行测量
+        self.message_tree.setUniformRowHeights(True)
+        self.message_tree.doubleClicked.connect(self.show_conversation_details)
 
         # 设置列宽
         header = self.message_tree.header()
@@ -1045,12 +1389,15 @@ class MessageManagerScreen(QWidget):
         right_layout.setContentsMargins(0 , 0,0, 0)
 
         log_label = QLabel("操作日志")
-        log_label.setStyleSheet("font-weight: bold; color: #ecf0f1; padding: 5px;")
+        log_label.setObjectName("messageSectionLabel")
         right_layout.addWidget(log_label)
 
-        self.log_text = QTextEdit()
+        # 纯文本日志，追加时不需要富文本重排；只保留最近的行，防止长时间获取后内存上涨
+        self.log_text = QPlainTextEdit()
         self.log_text.setMaximumHeight(600)
         self.log_text.setReadOnly(True)
+        self.log_text.setMaximumBlockCount(5000)
+        self.log_text.setUndoRedoEnabled(False)  # 只读日志不需要撤销记录，否则每次追加都会保存一份
         right_layout.addWidget(self.log_text)
 
         main_layout.addWidget(right_widget)
@@ -1095,7 +1442,16 @@ class MessageManagerScreen(QWidget):
 
     def log(self, message):
         timestamp = datetime.now().strftime("%H:%M:%S")
-        self.log_text.append(f"[{timestamp}] {message}")
+        # 先放入缓冲区，由定时器每100ms一次性写入日志框，获取期间大量日志不再逐条重绘
+        self._log_buffer.append(f"[{timestamp}] {message}")
+        if not self._log_timer.isActive():
+            self._log_timer.start()
+
+    def _flush_log(self):
+        """把缓冲的日志一次性追加到日志框"""
+        if self._log_buffer:
+            self.log_text.appendPlainText('\n'.join(self._log_buffer))
+            self._log_buffer.clear()
 
     def fetch_all_messages(self):
         """获取全部消息"""
@@ -1118,7 +1474,6 @@ class MessageManagerScreen(QWidget):
                 return
             elif reply == QMessageBox.StandardButton.No:
                 self.cache.clear()
-                self.messages = []
                 self.log("已清空消息缓存，将从最新消息开始获取")
             else:
                 self.log(f"将从上次断点（{last_time}）继续获取更早的消息")
@@ -1131,7 +1486,6 @@ class MessageManagerScreen(QWidget):
             if reply == QMessageBox.StandardButton.No:
                 return
             self.cache.clear()
-            self.messages = []
             self.log("已清空消息缓存，将重新获取所有消息")
 
         self.start_fetch_thread("all")
@@ -1185,42 +1539,109 @@ class MessageManagerScreen(QWidget):
         )
         if reply == QMessageBox.StandardButton.Yes:
             self.cache.clear()
-            self.messages = []
             self.update_message_display()
             self.log("已清空所有消息缓存")
 
-    def search_messages(self):
-        """搜索消息"""
-
+    def search_messages(self, explicit=True):
+        """搜索消息（在后台线程中完成匹配）；explicit 为 False 表示输入时的自动搜索，不写日志"""
+        self._search_timer.stop()
         keyword = self.search_entry.text().strip()
         if not keyword:
-            self.clear_search()
+            self.clear_search(explicit)
             return
 
-        self.filtered_messages = []
-        search_content = self.search_content_cb.isChecked()
-        search_uid = self.search_uid_cb.isChecked()
-
-        for msg in self.messages:
-            if search_content and keyword.lower() in msg['content'].lower():
-                self.filtered_messages.append(msg)
-            elif search_uid and keyword in str(msg['sender_uid']):
-                self.filtered_messages.append(msg)
-
-        self.log(f"搜索 '{keyword}' 找到 {len(self.filtered_messages)} 条消息")
-        self.update_message_display(use_filtered=True)
-
-    def clear_search(self):
-        """清除搜索"""
+        self._search_gen += 1
+        self._search_keyword = keyword
+        self._search_explicit = explicit
+        messages = self.messages
+        cached = self._search_index
+        # 消息只在获取/删除/清空时变化，列表对象和长度不变就说明顺序和内容都没变，索引可以复用
+        search_index = cached[2] if cached and cached[0] is messages and cached[1] == len(messages) else None
+
+        thread = MessageSearchThread(
+            self._search_gen, (messages, len(messages)), list(messages), search_index,
+            keyword, self.search_content_cb.isChecked(), self.search_uid_cb.isChecked(),
+            self.uid_prefix_cb.isChecked()
+        )
+        thread.result_ready.connect(self._on_search_result)
+        thread.finished.connect(lambda: self._search_threads.discard(thread))
+        self._search_threads.add(thread)
+        thread.start()
+
+    @pyqtSlot(int, object, object, object)
+    def _on_search_result(self, generation, source, matched, index):
+        source_messages, source_len = source
+        # 搜索期间消息列表没有变化时，把索引留给下次搜索复用
+        if source_messages is self.messages and source_len == len(self.messages):
+            self._search_index = (source_messages, source_len, index)
+        if generation != self._search_gen:
+            return  # 已有更新的搜索请求，或搜索已被清除
+        self.filtered_messages = matched
+        if self._search_explicit:
+            self.log(f"搜索 '{self._search_keyword}' 找到 {len(self.filtered_messages)} 条消息")
+        self.update_message_display(use_filtered=True, log=self._search_explicit)
+
+    def wait_for_search(self):
+        """等待后台搜索线程结束（关闭窗口时使用）"""
+        self._search_gen += 1
+        for thread in list(self._search_threads):
+            thread.wait()
+
+    @staticmethod
+    def build_search_index(messages):
+        """按消息顺序拼接搜索文本，返回 (casefold 后的内容, UID字符串) 两组 (整串, 各条起点)"""
+        contents = [msg['content'].casefold() for msg in messages]
+        uids = [str(msg['sender_uid']) for msg in messages]
+        return MessageManagerScreen._join_for_search(contents), MessageManagerScreen._join_for_search(uids)
+
+    @staticmethod
+    def _join_for_search(texts):
+        """用 \\x00 拼接文本（关键字不会跨条匹配），返回 (整串, 每条文本在整串中的起点)"""
+        starts = []
+        pos = 0
+        for text in texts:
+            starts.append(pos)
+            pos += len(text) + 1
+        return '\x00'.join(texts), starts
+
+    @staticmethod
+    def _find_in_joined(joined, keyword, hits):
+        """把包含 keyword 的文本下标加入 hits，每条文本命中一次后直接跳到下一条"""
+        text, starts = joined
+        find = text.find
+        last = len(starts) - 1
+        pos = find(keyword)
+        while pos != -1:
+            i = bisect_right(starts, pos) - 1
+            hits.add(i)
+            if i >= last:
+                break
+            pos = find(keyword, starts[i + 1])
+
+    @staticmethod
+    def _find_prefix_in_joined(joined, keyword, hits):
+        """把以 keyword 开头的文本下标加入 hits：在整串中查找 \\x00+keyword，每处命中对应下一条文本"""
+        text, starts = joined
+        if starts and text.startswith(keyword):
+            hits.add(0)
+        needle = '\x00' + keyword
+        pos = text.find(needle)
+        while pos != -1:
+            hits.add(bisect_right(starts, pos + 1) - 1)
+            pos = text.find(needle, pos + 1)
+
+    def clear_search(self, explicit=True):
+        """清除搜索；explicit 为 False 表示输入框被删空时的自动清除，不写日志"""
+        self._search_gen += 1  # 丢弃尚未返回的搜索结果
         self.search_entry.clear()
+        self._search_timer.stop()  # 清空输入框触发的防抖搜索不再需要
         self.filtered_messages = []
-        self.update_message_display()
-        self.log("已清除搜索过滤")
+        self.update_message_display(log=explicit)
+        if explicit:
+            self.log("已清除搜索过滤")
 
-    def update_message_display(self, use_filtered=False):
+    def update_message_display(self, use_filtered=False, log=True):
         """更新消息显示"""
-        self.message_tree.clear()
-
         messages_to_show = self.filtered_messages if use_filtered else self.messages
 
         # 更新标签
@@ -1231,104 +1652,96 @@ class MessageManagerScreen(QWidget):
         else:
             self.list_label.setText(f"消息列表 (双击查看完整对话) - 共 {total_count} 条")
 
-        # 按时间排序
-        messages_to_show.sort(key=lambda m: m['timestamp'], reverse=True)
+        # 缓存中的消息始终按时间倒序保存，搜索结果按同样顺序筛出，这里无需再排序
         # 对视频推送消息进行折叠处理
         if not use_filtered:  # 只在非搜索状态下折叠
-            collapsed_messages = []
-            video_push_latest = {}  # 记录每个UID最新的视频推送消息
+            messages_to_show = self._get_collapsed_rows()
 
-            for msg_data in messages_to_show:
-                msg_type = msg_data.get('msg_type', 0)
-                sender_uid = msg_data.get('sender_uid', 0)
-
-                # 检查是否为视频推送消息
-                is_video_push = False
-                if msg_type == 11:
-                    try:
-                        # 使用原始content数据进行判断
-                        raw_content = msg_data.get('raw_content', '')
-                        if raw_content:
-                            content_data = json.loads(raw_content)
-                            if 'bvid' in content_data and 'title' in content_data:
-                                is_video_push = True
-                    except:
-                        pass
-
-                if is_video_push:
-                    # 对于视频推送消息，只保留每个UID的最新一条
-                    if sender_uid not in video_push_latest:
-                        video_push_latest[sender_uid] = msg_data
-                        collapsed_messages.append(msg_data)
-                else:
-                    # 非视频推送消息，正常添加
-                    collapsed_messages.append(msg_data)
+        # 已不在缓存中的消息（清空、删除会话后）不再保留行缓存
+        self.message_model.prune_cache(self.messages)
+        self.message_model.set_rows(messages_to_show)
 
-            messages_to_show = collapsed_messages
+        if log:
+            self.log(f"显示 {len(messages_to_show)} 条消息")
 
-        for msg_data in messages_to_show:
-            try:
-                ts = self.normalize_timestamp(msg_data['timestamp'])
-                time_str = datetime.fromtimestamp(ts).strftime('%Y-%m-%d %H:%M:%S')
+    def _get_collapsed_rows(self):
+        """返回折叠视频推送后的完整消息列表，消息列表没有变化时复用上次的结果"""
+        messages = self.messages
+        cached = self._collapsed_rows
+        if cached is not None and cached[0] is messages and cached[1] == len(messages):
+            return cached[2]
 
-                # 处理内容摘要
-                content_summary = msg_data['content'][:100] + '...' if len(msg_data['content']) > 100 else msg_data['content']
+        collapsed_messages = []
+        video_push_uids = set()  # 已保留最新一条视频推送的UID
 
-                # 获取消息状态
-                msg_status = msg_data.get('msg_status', 0)
-                is_unread = msg_data.get('is_unread', False)
+        for msg_data in messages:
+            if self._is_video_push(msg_data):
+                # 对于视频推送消息，只保留每个UID的最新一条
+                sender_uid = msg_data.get('sender_uid', 0)
+                if sender_uid not in video_push_uids:
+                    video_push_uids.add(sender_uid)
+                    collapsed_messages.append(msg_data)
+            else:
+                # 非视频推送消息，正常添加
+                collapsed_messages.append(msg_data)
 
-                # 构建状态文本
-                status_parts = []
-                if msg_status != 0:
-                    status_parts.append(self._get_status_text(msg_status))
-                if is_unread:
-                    status_parts.append("未读")
+        self._collapsed_rows = (messages, len(messages), collapsed_messages)
+        return collapsed_messages
 
-                status_text = " | ".join(status_parts) if status_parts else "已读"
+    def _format_message_row(self, msg_data):
+        """生成消息列表一行的四列文本，返回 (文本元组, 是否为折叠的视频推送)"""
+        time_str = _format_timestamp(self.normalize_timestamp(msg_data['timestamp']))
 
-                # 发送者显示
-                sender_uid_display = f"UID: {msg_data['sender_uid']}"
+        # 处理内容摘要
+        content_summary = msg_data['content'][:100] + '...' if len(msg_data['content']) > 100 else msg_data['content']
 
-                # 创建树形项
-                item = QTreeWidgetItem([time_str, sender_uid_display, content_summary, status_text])
-                item.setData(0, Qt.ItemDataRole.UserRole, msg_data['msg_seqno'])
+        # 状态文本只有少数几种组合，按 (状态码, 是否未读) 缓存
+        status_text = self._compose_status_text(msg_data.get('msg_status', 0), msg_data.get('is_unread', False))
 
-                # 标记是否为折叠的视频推送消息
-                is_collapsed_video = False
-                if msg_data.get('msg_type') == 11:
-                    try:
-                        content_data = json.loads(msg_data.get('content', '{}'))
-                        if 'bvid' in content_data and 'title' in content_data:
-                            is_collapsed_video = True
-                            # 在内容概要前添加折叠标识
-                            current_text = item.text(2)
-                            item.setText(2, f"📁 [已折叠] {current_text}")
-                    except:
-                        pass
-
-                item.setData(1, Qt.ItemDataRole.UserRole, is_collapsed_video)  # 存储折叠标识
-
-                # 设置样式
-                if msg_status in [1, 2]:  # 撤回的消息
-                    for col in range(4):
-                        item.setForeground(col, Qt.GlobalColor.gray)
-                elif is_unread:  # 未读消息
-                    font = QFont()
-                    font.setBold(True)
-                    # 设置未读消息为橙色加粗
-                    from PyQt6.QtGui import QBrush
-                    unread_color = QBrush(QColor(240,230,140))
-                    for col in range(4):
-                        item.setFont(col, font)
-                        item.setForeground(col, unread_color)
-
-                self.message_tree.addTopLevelItem(item)
-            except Exception as e:
-                logger.error(f"显示消息时出错: {e}")
-                continue
+        # 发送者显示
+        sender_uid = msg_data['sender_uid']
+        sender_uid_display = self._uid_display_cache.get(sender_uid)
+        if sender_uid_display is None:
+            sender_uid_display = self._uid_display_cache[sender_uid] = f"UID: {sender_uid}"
 
-        self.log(f"显示 {len(messages_to_show)} 条消息")
+        # 标记是否为折叠的视频推送消息
+        is_collapsed_video = self._is_video_push(msg_data)
+        if is_collapsed_video:
+            # 在内容概要前添加折叠标识
+            content_summary = f"📁 [已折叠] {content_summary}"
+
+        return (time_str, sender_uid_display, content_summary, status_text), is_collapsed_video
+
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def _compose_status_text(msg_status, is_unread):
+        """生成状态列文本，例如：已撤回 | 未读"""
+        status_parts = []
+        if msg_status != 0:
+            status_parts.append(MessageManagerScreen.MESSAGE_STATUS_TEXT.get(msg_status, f"未知({msg_status})"))
+        if is_unread:
+            status_parts.append("未读")
+        return " | ".join(status_parts) if status_parts else "已读"
+
+    def _is_video_push(self, msg):
+        """是否为视频推送消息（类型11且原始content带bvid和title），结果按 msg_seqno 记住"""
+        if msg.get('msg_type') != 11:
+            return False
+        seqno = msg['msg_seqno']
+        is_video_push = self._video_push_flags.get(seqno)
+        if is_video_push is None:
+            is_video_push = False
+            try:
+                # 使用原始content数据进行判断
+                raw_content = msg.get('raw_content', '')
+                # 先做子串检查，不含这两个键名的内容（绝大多数通知）无需解码
+                if raw_content and '"bvid"' in raw_content and '"title"' in raw_content:
+                    content_data = _load_content_json(raw_content)
+                    is_video_push = 'bvid' in content_data and 'title' in content_data
+            except:
+                pass
+            self._video_push_flags[seqno] = is_video_push
+        return is_video_push
 
     def normalize_timestamp(self, ts):
         """标准化时间戳为秒级"""
@@ -1338,15 +1751,27 @@ class MessageManagerScreen(QWidget):
 
     def select_all(self):
         """全选"""
-        for i in range(self.message_tree.topLevelItemCount()):
-            item = self.message_tree.topLevelItem(i)
-            item.setSelected(True)
+        self.message_tree.selectAll()
 
     def inverse_select(self):
         """反选"""
-        for i in range(self.message_tree.topLevelItemCount()):
-            item = self.message_tree.topLevelItem(i)
-            item.setSelected(not item.isSelected())
+        row_count = self.message_model.rowCount()
+        if not row_count:
+            return
+        last_column = self.message_model.columnCount() - 1
+        all_rows = QItemSelection(self.message_model.index(0, 0),
+                                  self.message_model.index(row_count - 1, last_column))
+        self.message_tree.selectionModel().select(
+            all_rows,
+            QItemSelectionModel.SelectionFlag.Toggle | QItemSelectionModel.SelectionFlag.Rows
+        )
+
+    def _selected_seqnos(self):
+        """当前选中行对应的 msg_seqno 集合"""
+        return {
+            index.data(Qt.ItemDataRole.UserRole)
+            for index in self.message_tree.selectionModel().selectedRows(0)
+        }
 
     def mark_as_read(self):
         """标记已读"""
@@ -1354,22 +1779,16 @@ class MessageManagerScreen(QWidget):
             self.log("正在进行其他操作，请稍后再试。")
             return
 
-        selected_items = self.message_tree.selectedItems()
-        if not selected_items:
+        selected_seqnos = self._selected_seqnos()
+        if not selected_seqnos:
             QMessageBox.warning(self, "提示", "请先选择要标记的消息所在的会话 (Ctrl+单击可多选)")
             return
 
         talker_ids_seqnos = {}
-        for item in selected_items:
-            try:
-                seqno = item.data(0, Qt.ItemDataRole.UserRole)
-                msg = next((m for m in self.messages if m['msg_seqno'] == seqno), None)
-                if msg:
-                    tid = msg['talker_id']
-                    if tid not in talker_ids_seqnos or seqno > talker_ids_seqnos[tid]:
-                        talker_ids_seqnos[tid] = seqno
-            except:
-                continue
+        for seqno, msg in self._find_selected_messages(selected_seqnos):
+            tid = msg['talker_id']
+            if seqno > talker_ids_seqnos.get(tid, -1):
+                talker_ids_seqnos[tid] = seqno
 
         if not talker_ids_seqnos:
             QMessageBox.warning(self, "提示", "无法从选定项确定会话信息。")
@@ -1377,26 +1796,26 @@ class MessageManagerScreen(QWidget):
 
         self.start_operation_thread("mark_read", talker_ids_seqnos)
 
+    def _find_selected_messages(self, selected_seqnos):
+        """把选中行的 msg_seqno 映射回消息，逐个产出 (seqno, msg)，已不在缓存中的跳过"""
+        get_message = self.cache.get_message
+        for seqno in selected_seqnos:
+            msg = get_message(seqno)
+            if msg is not None:
+                yield seqno, msg
+
     def batch_delete(self):
         """批量删除"""
         if self.operation_thread and self.operation_thread.isRunning():
             self.log("正在进行其他操作，请稍后再试。")
             return
 
-        selected_items = self.message_tree.selectedItems()
-        if not selected_items:
+        selected_seqnos = self._selected_seqnos()
+        if not selected_seqnos:
             QMessageBox.warning(self, "提示", "请先选择要删除的消息所在的会话 (Ctrl+单击可多选)")
             return
 
-        talker_ids_to_delete = set()
-        for item in selected_items:
-            try:
-                seqno = item.data(0, Qt.ItemDataRole.UserRole)
-                msg = next((m for m in self.messages if m['msg_seqno'] == seqno), None)
-                if msg:
-                    talker_ids_to_delete.add(msg['talker_id'])
-            except:
-                continue
+        talker_ids_to_delete = {msg['talker_id'] for _, msg in self._find_selected_messages(selected_seqnos)}
 
         if not talker_ids_to_delete:
             QMessageBox.warning(self, "提示", "无法从选定项确定要删除的会话。")
@@ -1439,15 +1858,15 @@ class MessageManagerScreen(QWidget):
         """操作完成"""
         self.stop_operation_btn.setEnabled(False)
 
-    def show_conversation_details(self, item):
+    def show_conversation_details(self, index):
         """显示完整对话详情"""
         try:
-            msg_seqno_to_find = item.data(0, Qt.ItemDataRole.UserRole)
-            is_collapsed_video = item.data(1, Qt.ItemDataRole.UserRole)
+            msg_seqno_to_find = index.siblingAtColumn(0).data(Qt.ItemDataRole.UserRole)
+            is_collapsed_video = index.siblingAtColumn(1).data(Qt.ItemDataRole.UserRole)
         except:
             return
 
-        clicked_message = next((msg for msg in self.messages if msg['msg_seqno'] == msg_seqno_to_find), None)
+        clicked_message = self.cache.get_message(msg_seqno_to_find)
         if not clicked_message:
             QMessageBox.information(self, "详情", "未找到该消息的详细数据。")
             return
@@ -1455,24 +1874,12 @@ class MessageManagerScreen(QWidget):
         target_talker_id = clicked_message['talker_id']
 
         # 如果是折叠的视频推送消息，只显示该UID的视频推送消息
+        # 两种情况都只在该会话的消息里查找，视频推送判断已按 msg_seqno 记住，不会重复解码
+        conversation_messages = self.cache.get_talker_messages(target_talker_id)
         if is_collapsed_video:
-            conversation_messages = []
-            for msg in self.messages:
-                if msg['talker_id'] == target_talker_id and msg.get('msg_type') == 11:
-                    try:
-                        # 使用原始content数据进行判断
-                        raw_content = msg.get('raw_content', '')
-                        if raw_content:
-                            content_data = json.loads(raw_content)
-                            if 'bvid' in content_data and 'title' in content_data:
-                                conversation_messages.append(msg)
-                    except:
-                        pass
-        else:
-            # 正常情况，显示所有消息
-            conversation_messages = [msg for msg in self.messages if msg['talker_id'] == target_talker_id]
+            conversation_messages = [msg for msg in conversation_messages if self._is_video_push(msg)]
 
-        conversation_messages.sort(key=lambda m: m['timestamp'])
+        conversation_messages.sort(key=itemgetter('timestamp'))
 
         # 创建对话详情窗口
         detail_dialog = ConversationDetailDialog(self, target_talker_id, conversation_messages)
@@ -1482,24 +1889,16 @@ class MessageManagerScreen(QWidget):
         """增强的消息内容解析"""
         msg_type = msg['msg_type']
         content_str = msg.get('content', '')
+        if isinstance(content_str, str):
+            return self._parse_content_cached(msg_type, content_str)
+        return self._parse_content(msg_type, content_str)
 
-        # 消息类型处理器
-        type_handlers = {
-            1: self._parse_text_message,
-            2: self._parse_image_message,
-            3: self._parse_video_message,
-            4: self._parse_emoticon_message,
-            5: self._parse_recall_message,
-            6: self._parse_share_message,
-            7: self._parse_audio_message,
-            10: self._parse_official_message,
-            11: self._parse_notification_message,
-            18: self._parse_interactive_message,
-        }
-
-        handler = type_handlers.get(msg_type, self._parse_unknown_message)
+    def _parse_content(self, msg_type, content_str):
+        """按消息类型解析原始内容"""
+        handler = self._content_parsers.get(msg_type, self._parse_unknown_message)
         try:
-            return handler(content_str, msg)
+            # 处理器只会从 msg 中读取 msg_type
+            return handler(content_str, {'msg_type': msg_type})
         except Exception as e:
             logger.error(f"解析消息类型 {msg_type} 时出错: {e}")
             return f"[消息类型 {msg_type} 解析错误]"
@@ -1507,7 +1906,7 @@ class MessageManagerScreen(QWidget):
     def _parse_text_message(self, content_str, msg):
         """解析文本消息"""
         try:
-            data = json.loads(content_str)
+            data = _load_content_json(content_str)
             return data.get('content', content_str)
         except:
             return content_str
@@ -1515,7 +1914,7 @@ class MessageManagerScreen(QWidget):
     def _parse_image_message(self, content_str, msg):
         """增强的图片消息解析"""
         try:
-            data = json.loads(content_str)
+            data = _load_content_json(content_str)
             width = data.get('width', 0)
             height = data.get('height', 0)
             imageType = data.get('imageType', '')
@@ -1537,7 +1936,7 @@ class MessageManagerScreen(QWidget):
     def _parse_video_message(self, content_str, msg):
         """解析视频消息"""
         try:
-            data = json.loads(content_str)
+            data = _load_content_json(content_str)
             title = data.get('title', '视频')
             duration = data.get('duration', 0)
             return f"[视频: {title} ({duration}秒)]"
@@ -1547,7 +1946,7 @@ class MessageManagerScreen(QWidget):
     def _parse_emoticon_message(self, content_str, msg):
         """解析表情消息"""
         try:
-            data = json.loads(content_str)
+            data = _load_content_json(content_str)
             text = data.get('text', '')
             return f"[表情: {text}]" if text else "[表情]"
         except:
@@ -1557,7 +1956,7 @@ class MessageManagerScreen(QWidget):
         """解析撤回消息"""
         try:
             if content_str:
-                data = json.loads(content_str)
+                data = _load_content_json(content_str)
                 if 'content' in data:
                     return f"[消息已撤回，原内容: {data['content'][:20]}...]"
         except:
@@ -1567,7 +1966,7 @@ class MessageManagerScreen(QWidget):
     def _parse_share_message(self, content_str, msg):
         """解析分享消息"""
         try:
-            data = json.loads(content_str)
+            data = _load_content_json(content_str)
             title = data.get('title', '')
             return f"[分享: {title}]" if title else "[分享消息]"
         except:
@@ -1576,7 +1975,7 @@ class MessageManagerScreen(QWidget):
     def _parse_audio_message(self, content_str, msg):
         """解析语音消息"""
         try:
-            data = json.loads(content_str)
+            data = _load_content_json(content_str)
             duration = data.get('duration', 0)
             return f"[语音消息: {duration}秒]"
         except:
@@ -1585,7 +1984,7 @@ class MessageManagerScreen(QWidget):
     def _parse_official_message(self, content_str, msg):
         """解析官方消息"""
         try:
-            data = json.loads(content_str)
+            data = _load_content_json(content_str)
             title = (data.get('title') or
                      data.get('template', {}).get('title') or
                      data.get('content', {}).get('title') or
@@ -1608,7 +2007,7 @@ class MessageManagerScreen(QWidget):
     def _parse_notification_message(self, content_str, msg):
         """解析通知消息"""
         try:
-            data = json.loads(content_str)
+            data = _load_content_json(content_str)
 
             # 检查是否为视频推送消息（有bvid和title字段）
             if 'bvid' in data and 'title' in data:
@@ -1623,7 +2022,7 @@ class MessageManagerScreen(QWidget):
     def _parse_interactive_message(self, content_str, msg):
         """解析互动消息"""
         try:
-            data = json.loads(content_str)
+            data = _load_content_json(content_str)
             text = data.get('text', '')
             title = data.get('title', '')
             return f"[互动: {title or text}]" if (title or text) else "[互动消息]"
@@ -1633,7 +2032,7 @@ class MessageManagerScreen(QWidget):
     def _parse_video_push_message(self, content_str, msg):
         """解析视频推送消息"""
         try:
-            data = json.loads(content_str)
+            data = _load_content_json(content_str)
             title = data.get('title', '')
             times = data.get('times', 0)
             bvid = data.get('bvid', '')
@@ -1693,7 +2092,7 @@ class MessageManagerScreen(QWidget):
         """解析未知类型消息"""
         msg_type = msg.get('msg_type', 'Unknown')
         try:
-            data = json.loads(content_str)
+            data = _load_content_json(content_str)
             for key in ['content', 'text', 'title', 'message', 'desc']:
                 if key in data and data[key]:
                     return f"[类型{msg_type}: {str(data[key])[:50]}...]"
@@ -1710,7 +2109,7 @@ class MessageManagerScreen(QWidget):
             if not content_str:
                 return None
 
-            data = json.loads(content_str)
+            data = _load_content_json(content_str)
 
             possible_paths = [
                 lambda d: d.get('url'),
@@ -1735,16 +2134,6 @@ class MessageManagerScreen(QWidget):
 
         return None
 
-    def _get_status_text(self, status):
-        """获取消息状态文本"""
-        return {
-            0: "正常",
-            1: "已撤回",
-            2: "系统撤回",
-            4: "发送中",
-            50: "无效图片"
-        }.get(status, f"未知({status})")
-
     def closeEvent(self, event):
         """窗口关闭时清理"""
         # 停止所有线程
@@ -1756,13 +2145,70 @@ class MessageManagerScreen(QWidget):
             self.operation_thread.stop()
             self.operation_thread.wait(2000)
 
+        self.wait_for_search()
+        self._log_timer.stop()
+        self._flush_log()
+        self.http.close()
         self.window_closed.emit()
         super().closeEvent(event)
 
 
+class ConversationRenderThread(QThread):
+    """在后台线程拼接对话HTML并解析成 QTextDocument，主线程只需把文档挂到文本框上。
+    长对话先发出只含前 first_batch 条消息的文档，让内容尽快显示，再发出完整文档"""
+    document_ready = pyqtSignal(object)
+
+    def __init__(self, build_html, messages, style_sheet="", first_batch=200):
+        super().__init__()
+        self.build_html = build_html  # 消息列表 -> HTML
+        self.messages = messages
+        self.style_sheet = style_sheet
+        self.first_batch = first_batch
+        self._is_running = True
+
+    def stop(self):
+        self._is_running = False
+
+    def run(self):
+        try:
+            html_text = self.build_html(self.messages[:self.first_batch])
+            if len(self.messages) > self.first_batch:
+                self._emit_document(html_text)
+                if not self._is_running:
+                    return
+                html_text += self.build_html(self.messages[self.first_batch:])
+            self._emit_document(html_text)
+        except Exception as e:
+            logger.error(f"渲染对话失败: {e}")
+
+    def _emit_document(self, html_text):
+        doc = QTextDocument()
+        doc.setUndoRedoEnabled(False)  # 只读内容，不保留撤销记录
+        doc.setDefaultStyleSheet(self.style_sheet)  # 必须在 setHtml 之前设置才会生效
+        doc.setHtml(html_text)
+        if not self._is_running:
+            return  # 对话框已关闭，文档仍属于本线程，直接在这里释放
+        # 文档在本线程创建，交给主线程后才能被文本框使用
+        doc.moveToThread(QApplication.instance().thread())
+        self.document_ready.emit(doc)
+
+
 class ConversationDetailDialog(QDialog):
     """对话详情对话框"""
 
+    # 渲染线程在结束前一直保存在这里：对话框关闭时不等待线程，线程对象也不会先于线程被销毁
+    _render_threads = set()
+
+    # 对话HTML中各部分的颜色，生成的HTML只引用类名
+    CONVERSATION_STYLE = (
+        ".sender-self { color: #00ff00; }"
+        ".sender-other { color: #0000ff; }"
+        ".meta { color: #a0a0a4; }"
+        ".recalled { color: #ff0000; }"
+        ".unread { color: #ffff00; }"
+        ".body { color: #ffffff; }"
+    )
+
     def __init__(self, parent, talker_id, conversation_messages):
         super().__init__(parent)
         self.talker_id = talker_id
@@ -1789,6 +2235,7 @@ class ConversationDetailDialog(QDialog):
         # 防止链接点击后内容丢失
         self.text_area.setOpenLinks(False)  # 禁用默认链接处理
         self.text_area.setOpenExternalLinks(False)  # 禁用外部链接自动打开
+        self.text_area.setPlainText("正在加载对话...")
 
         layout.addWidget(self.text_area)
 
@@ -1803,86 +2250,107 @@ class ConversationDetailDialog(QDialog):
         layout.addLayout(button_layout)
 
     def load_conversation(self):
-        """加载对话内容"""
-        # 保存当前内容（如果有的话）
-        current_content = self.text_area.toHtml() if hasattr(self, 'text_area') else ""
-        self.text_area.clear()
-
-        for msg in self.conversation_messages:
+        """加载对话内容：在后台线程拼接HTML并解析成文档，完成后整体替换，长对话也不会卡住界面"""
+        self.render_thread = ConversationRenderThread(
+            self._build_conversation_html, self.conversation_messages, self.CONVERSATION_STYLE
+        )
+        thread = self.render_thread
+        thread.document_ready.connect(self._on_document_ready)
+        # 线程结束后由 Qt 延迟删除，删除完成后再放开这里的引用
+        ConversationDetailDialog._render_threads.add(thread)
+        thread.finished.connect(thread.deleteLater)
+        thread.destroyed.connect(lambda: ConversationDetailDialog._render_threads.discard(thread))
+        thread.start()
+
+    @pyqtSlot(object)
+    def _on_document_ready(self, doc):
+        old_doc = self.text_area.document()
+        # 完整文档以先显示的部分为开头，保持滚动位置不跳回顶部
+        scroll_bar = self.text_area.verticalScrollBar()
+        scroll_pos = scroll_bar.value()
+
+        doc.setParent(self.text_area)  # 由文本框负责释放文档
+        doc.setDefaultFont(self.text_area.font())
+        self.text_area.setDocument(doc)
+        scroll_bar.setValue(scroll_pos)
+
+        # setDocument 不会释放被替换的文档
+        if old_doc.parent() is self.text_area:
+            old_doc.deleteLater()
+
+    def done(self, result):
+        # 不等待渲染线程（解析长对话可能需要较长时间），只通知它停止并不再接收结果；
+        # 线程对象由 _render_threads 持有，结束后自行释放
+        if self.render_thread.isRunning():
+            self.render_thread.stop()
             try:
-                ts = self.normalize_timestamp(msg['timestamp'])
-                time_str = datetime.fromtimestamp(ts).strftime('%Y-%m-%d %H:%M:%S')
+                self.render_thread.document_ready.disconnect(self._on_document_ready)
+            except TypeError:
+                pass
+        super().done(result)
+
+    def _build_conversation_html(self, messages):
+        """拼接一段对话消息的HTML（在渲染线程中调用，不访问任何控件）"""
+        parts = []
+        for msg in messages:
+            try:
+                time_str = _format_timestamp(self.normalize_timestamp(msg['timestamp']))
                 sender_display = f"UID: {msg['sender_uid']}"
 
                 # 获取消息状态
                 status = msg.get('msg_status', 0)
                 is_unread = msg.get('is_unread', False)
-                status_text = self.get_status_text(status)
 
                 # 显示发送者和时间
-                if msg['sender_uid'] == self.talker_id:
-                    self.text_area.setTextColor(Qt.GlobalColor.green)
-                else:
-                    self.text_area.setTextColor(Qt.GlobalColor.blue)
-
-                self.text_area.insertPlainText(f"{sender_display} ")
-
-                self.text_area.setTextColor(Qt.GlobalColor.gray)
-                self.text_area.insertPlainText(f"({time_str})")
+                sender_class = 'sender-self' if msg['sender_uid'] == self.talker_id else 'sender-other'
+                header = [
+                    f'<span class="{sender_class}">{sender_display} </span>',
+                    f'<span class="meta">({time_str})</span>',
+                ]
 
                 # 显示消息状态
                 if status != 0:
-                    if status in [1, 2]:
-                        self.text_area.setTextColor(Qt.GlobalColor.red)
-                        self.text_area.insertPlainText(f" [{status_text}]")
-                    else:
-                        self.text_area.setTextColor(Qt.GlobalColor.gray)
-                        self.text_area.insertPlainText(f" [{status_text}]")
+                    status_class = 'recalled' if status in [1, 2] else 'meta'
+                    header.append(f'<span class="{status_class}"> [{self.get_status_text(status)}]</span>')
                 elif is_unread:
-                    self.text_area.setTextColor(Qt.GlobalColor.yellow)
-                    self.text_area.insertPlainText(" [未读]")
+                    header.append('<span class="unread"> [未读]</span>')
 
-                self.text_area.setTextColor(Qt.GlobalColor.gray)
-                self.text_area.insertPlainText(":\n")
+                header.append('<span class="meta">:</span>')
 
                 # 处理消息内容
                 content = msg['content']
-                self.text_area.setTextColor(Qt.GlobalColor.white)
 
                 # 检查是否为视频推送消息
                 if msg.get('msg_type') == 11:
                     try:
-                        import json
-                        data = json.loads(content)
+                        data = _load_content_json(content)
                         if 'bvid' in data and 'title' in data:
                             # 格式化视频推送消息在详情窗口的显示
-                            formatted_content = self._format_video_push_for_detail(content)
-                            self.text_area.insertHtml(formatted_content + "<br>")
+                            body = self._format_video_push_for_detail(data)
                         else:
                             # 普通通知消息
-                            processed_content = self._process_links_in_content(content)
-                            self.text_area.insertHtml(processed_content + "<br>")
+                            body = self._process_links_in_content(content)
                     except:
-                        processed_content = self._process_links_in_content(content)
-                        self.text_area.insertHtml(processed_content + "<br>")
+                        body = self._process_links_in_content(content)
                 elif msg.get('msg_type') == 2 or '[图片' in content:
                     # 图片消息
-                    self.text_area.insertPlainText(content + "\n")
+                    body = html.escape(content).replace('\n', '<br>')
                     if 'image_url' in msg:
                         image_url = msg['image_url']
-                        link_html = f'<a href="{image_url}" style="color: cyan; text-decoration: underline;">🔗 图片链接: {image_url}</a><br>'
-                        self.text_area.insertHtml(link_html)
+                        body += f'<br><a href="{image_url}" style="color: cyan; text-decoration: underline;">🔗 图片链接: {image_url}</a>'
                 else:
                     # 普通消息，检查是否包含链接
-                    processed_content = self._process_links_in_content(content)
-                    self.text_area.insertHtml(processed_content + "<br>")
+                    body = self._process_links_in_content(content)
 
-                self.text_area.insertPlainText("\n")
+                parts.append(f'<div>{"".join(header)}</div>')
+                parts.append(f'<div class="body">{body}</div><br>')
 
             except Exception as e:
                 logger.error(f"显示对话消息时出错: {e}")
                 continue
 
+        return ''.join(parts)
+
     def normalize_timestamp(self, ts):
         """标准化时间戳为秒级"""
         if ts > 1e10:
@@ -1891,26 +2359,18 @@ class ConversationDetailDialog(QDialog):
 
     def get_status_text(self, status):
         """获取消息状态文本"""
-        return {
-            0: "正常",
-            1: "已撤回",
-            2: "系统撤回",
-            4: "发送中",
-            50: "无效图片"
-        }.get(status, f"未知({status})")
-
-    def _format_video_push_for_detail(self, content):
-        """在详情窗口格式化视频推送消息"""
-        try:
-            import json
-            data = json.loads(content)
+        return MessageManagerScreen.MESSAGE_STATUS_TEXT.get(status, f"未知({status})")
 
-            title = data.get('title', '')
+    def _format_video_push_for_detail(self, data):
+        """在详情窗口格式化视频推送消息，data 为已解码的消息内容"""
+        try:
+            # 标题、简介等是UP主填写的文本，转义后再拼进HTML
+            title = html.escape(data.get('title', ''), quote=False)
             times = data.get('times', 0)
-            desc = data.get('desc', '')
-            cover = data.get('cover', '')
-            bvid = data.get('bvid', '')
-            attach_msg = data.get('attach_msg', {}).get('content', '')
+            desc = html.escape(data.get('desc', ''), quote=False)
+            cover = html.escape(data.get('cover', ''))
+            bvid = html.escape(data.get('bvid', ''))
+            attach_msg = html.escape(data.get('attach_msg', {}).get('content', ''), quote=False)
 
             # 格式化时长
             if times > 0:
@@ -1957,24 +2417,19 @@ class ConversationDetailDialog(QDialog):
 
     def _process_links_in_content(self, content):
         """处理消息内容中的链接，将其转换为可点击的HTML链接"""
-        import re
-        # 定义各种链接的正则表达式
-        url_pattern = r'(https?://[^\s\u4e00-\u9fa5]+)'  # 匹配http/https链接，避免匹配中文
-
-        def replace_url(match):
-            url = match.group(1)
-            # 移除末尾可能的标点符号
-            while url and url[-1] in '.,;!?。，；！？':
-                url = url[:-1]
-            return f'<a href="{url}" style="color: cyan; text-decoration: underline;">{url}</a>'
+        # 大部分消息是不含链接、换行和特殊字符的纯文本，无需处理
+        if ('http' not in content and '\n' not in content
+                and '&' not in content and '<' not in content and '>' not in content):
+            return content
 
         # 先转义HTML特殊字符，但保留换行
-        content = content.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+        content = html.escape(content, quote=False)
 
-        # 替换链接
-        content = re.sub(url_pattern, replace_url, content)
+        # 替换链接（大部分消息不含链接，先用子串判断跳过正则扫描）
+        if 'http' in content:
+            content = _URL_PATTERN.sub(_url_to_anchor, content)
 
-        # 处理换行
+        # 处理换行（必须在替换链接之后，否则行尾链接会把 <br> 当成链接的一部分）
         content = content.replace('\n', '<br>')
 
         return content
@@ -1982,27 +2437,19 @@ class ConversationDetailDialog(QDialog):
     def open_link(self, url):
         """打开链接"""
         try:
-            from PyQt6.QtGui import QDesktopServices
-            from PyQt6.QtCore import QUrl
+            # anchorClicked 传入的已是 QUrl，直接使用，不再转成字符串后重新解析
+            if not isinstance(url, QUrl):
+                url = QUrl(str(url))
 
-            # 确保URL是字符串格式
-            if isinstance(url, QUrl):
-                url_str = url.toString()
-            else:
-                url_str = str(url)
-
-            logger.info(f"准备打开链接: {url_str}")
+            logger.info(f"准备打开链接: {url.toString()}")
 
             # 使用QDesktopServices打开链接
-            result = QDesktopServices.openUrl(QUrl(url_str))
-
-            if result:
-                logger.info(f"成功打开链接: {url_str}")
+            if QDesktopServices.openUrl(url):
+                logger.info(f"成功打开链接: {url.toString()}")
             else:
-                logger.warning(f"打开链接可能失败: {url_str}")
+                logger.warning(f"打开链接可能失败: {url.toString()}")
 
         except Exception as e:
             logger.error(f"打开链接失败: {e}")
             # 显示错误消息但不关闭对话框
-            from PyQt6.QtWidgets import QMessageBox
             QMessageBox.warning(self, "打开链接失败", f"无法打开链接: {e}")
\ No newline at end of file
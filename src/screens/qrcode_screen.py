@@ -1,6 +1,6 @@
 import asyncio
 import logging
-import io
+import threading
 from typing import Optional
 
 from PyQt6.QtWidgets import (
@@ -49,44 +49,64 @@ class QRCodeFetchThread(QThread):
 
 
 class QRCodeCheckThread(QThread):
-    """二维码状态检查线程"""
+    """二维码状态检查线程：整个登录过程只启动一次，复用同一个事件循环和HTTP会话，每次被唤醒时查询一次状态"""
     state_changed = pyqtSignal(int, object, object)  # state_code, csrf, cookie
     error = pyqtSignal(str)
 
-    def __init__(self, qr_data: QRData):
+    def __init__(self):
         super().__init__()
         self.setObjectName("QRCodeCheckThread")
-        self.qr_data = qr_data
-        self.api_service = ApiService()
+        self.qr_data: Optional[QRData] = None
+        self._wake = threading.Event()
+        self._busy = False
         self._is_running = True
 
     def stop(self):
         self._is_running = False
+        self._wake.set()
 
-    def run(self):#运行状态检查"
-        if not self._is_running:
+    def request_check(self, qr_data: QRData):
+        """请求检查一次状态；上一次检查还没完成时跳过"""
+        if self._busy:
             return
+        self.qr_data = qr_data  # 二维码过期重新获取后，下次检查使用新的二维码
+        self._busy = True
+        self._wake.set()
 
+    def run(self):#运行状态检查"
         loop = asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
+        api_service = ApiService()
 
         try:
-            async def check():
-                async with self.api_service:
-                    return await self.qr_data.get_state(self.api_service)
-
-            state_code, csrf, cookie = loop.run_until_complete(check())
-            if self._is_running:
-                self.state_changed.emit(state_code, csrf, cookie)
-        except Exception as e:
-            logger.error(f"检查二维码状态失败: {e}")
-            if self._is_running:
-                self.error.emit(str(e))
+            while True:
+                self._wake.wait()
+                self._wake.clear()
+                if not self._is_running:
+                    break
+
+                try:
+                    state_code, csrf, cookie = loop.run_until_complete(self.qr_data.get_state(api_service))
+                    if self._is_running:
+                        self.state_changed.emit(state_code, csrf, cookie)
+                except Exception as e:
+                    logger.error(f"检查二维码状态失败: {e}")
+                    if self._is_running:
+                        self.error.emit(str(e))
+                finally:
+                    self._busy = False
         finally:
+            try:
+                loop.run_until_complete(api_service.close())
+            except Exception as e:
+                logger.error(f"关闭二维码检查会话失败: {e}")
             loop.close()
 
 
 class QRCodeScreen(QWidget):#二维码登录页面
+    # 检测间隔（毫秒）：等待扫码时逐步加倍到上限，扫码后恢复为最短间隔
+    MIN_POLL_INTERVAL = 1000
+    MAX_POLL_INTERVAL = 5000
 
     login_success = pyqtSignal(object, bool)  # ApiService, aicu_state
     switch_to_cookie = pyqtSignal()
@@ -96,6 +116,7 @@ class QRCodeScreen(QWidget):#二维码登录页面
         self.qr_data: Optional[QRData] = None
         self.check_timer = QTimer()
         self.check_timer.timeout.connect(self.check_qr_state)
+        self._poll_interval = self.MIN_POLL_INTERVAL
 
         # 保存线程引用
         self.fetch_thread = None
@@ -152,20 +173,20 @@ class QRCodeScreen(QWidget):#二维码登录页面
 
         img = qr.make_image(fill_color="black", back_color="white")
 
-        #将PIL图像转换为QPixmap
-        buffer = io.BytesIO()
-        img.save(buffer, format='PNG')
-        buffer.seek(0)
-
-        qimage = QImage()
-        qimage.loadFromData(buffer.getvalue())
+        #将PIL图像转换为QPixmap：直接使用RGB像素数据，不再经过PNG编码和解码
+        pil_img = img.get_image().convert('RGB')
+        width, height = pil_img.size
+        # copy() 让QImage持有自己的像素数据，不依赖Python的bytes对象
+        qimage = QImage(pil_img.tobytes('raw', 'RGB'), width, height, width * 3,
+                        QImage.Format.Format_RGB888).copy()
         pixmap = QPixmap.fromImage(qimage)
 
         # 显示二维码
         self.qr_label.setPixmap(pixmap.scaled(300, 300, Qt.AspectRatioMode.KeepAspectRatio))
 
-        # 检测状态
-        self.check_timer.start(1000)  # 每秒一次
+        # 检测状态，新二维码从最短间隔开始
+        self._poll_interval = self.MIN_POLL_INTERVAL
+        self.check_timer.start(self._poll_interval)
 
     def on_fetch_error(self, error: str):
         #处理二维码获取错误
@@ -180,14 +201,14 @@ class QRCodeScreen(QWidget):#二维码登录页面
         if not self.qr_data or self._is_closing:
             return
 
-        # 如果已有检查线程在运行，跳过
-        if self.check_thread and self.check_thread.isRunning():
-            return
+        # 检查线程只创建一次，之后每次只唤醒它查询状态
+        if not self.check_thread:
+            self.check_thread = QRCodeCheckThread()
+            self.check_thread.state_changed.connect(self.on_state_changed)
+            self.check_thread.error.connect(lambda e: logger.error(f"状态检查错误: {e}"))
+            self.check_thread.start()
 
-        self.check_thread = QRCodeCheckThread(self.qr_data)
-        self.check_thread.state_changed.connect(self.on_state_changed)
-        self.check_thread.error.connect(lambda e: logger.error(f"状态检查错误: {e}"))
-        self.check_thread.start()
+        self.check_thread.request_check(self.qr_data)
 
     def on_state_changed(self, state_code: int, csrf: Optional[str], cookie: Optional[str]):
         #状态改变
@@ -215,6 +236,17 @@ class QRCodeScreen(QWidget):#二维码登录页面
             #QR码过期，重获取
             self.check_timer.stop()
             self.fetch_qr_code()
+        elif state_code == 86101:
+            # 还没扫码，状态短时间内不会变，逐步放慢检测
+            self._set_poll_interval(min(self._poll_interval * 2, self.MAX_POLL_INTERVAL))
+        elif state_code == 86090:
+            # 已扫码等待确认，恢复最短间隔尽快完成登录
+            self._set_poll_interval(self.MIN_POLL_INTERVAL)
+
+    def _set_poll_interval(self, interval: int):
+        if interval != self._poll_interval and self.check_timer.isActive():
+            self._poll_interval = interval
+            self.check_timer.setInterval(interval)
 
     def stop_all_threads(self):
         """停止所有线程"""
@@ -674,7 +674,7 @@ QStackedWidget QWidget {{
 }}
 
 /*--------------    文本编辑框 ------------------- */
-QTextEdit {{
+QTextEdit, QPlainTextEdit {{
     background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
                 stop:0 #334155, stop:1 #475569);
     border: 2px solid #64748b;
@@ -687,7 +687,7 @@ QTextEdit {{
     box-shadow: 0 4px 12px rgba(0, 0, 0, 0.2);
 }}
 
-QTextEdit:focus {{
+QTextEdit:focus, QPlainTextEdit:focus {{
     border: 2px solid #0ea5e9;
     box-shadow: 0 0 0 4px rgba(14, 165, 233, 0.2);
 }}
@@ -700,7 +700,7 @@ QVBoxLayout, QHBoxLayout, QGridLayout {{
 /* ============================================== 评论清理页面专用样式 ====================================================  */
 
 /*------------- 评论清理页面的数据列表样式 ---------------------- */
-QTableWidget#commentDataTable {{
+QTableView#commentDataTable {{
     background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
                 stop:0 #334155, stop:1 #475569);
     border: 2px solid #0ea5e9;
@@ -711,22 +711,44 @@ QTableWidget#commentDataTable {{
     box-shadow: 0 8px 24px rgba(0, 0, 0, 0.2);
 }}
 
-QTableWidget#commentDataTable::item {{
+QTableView#commentDataTable::item {{
     padding: 12px;
     border-bottom: 1px solid #64748b;
     border-radius: 4px;
 }}
 
-QTableWidget#commentDataTable::item:hover {{
+QTableView#commentDataTable::item:hover {{
     background: rgba(14, 165, 233, 0.2);
 }}
 
-QTableWidget#commentDataTable::item:selected {{
+QTableView#commentDataTable::item:selected {{
     background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
                 stop:0 rgba(14, 165, 233, 0.3), 
                 stop:1 rgba(2, 132, 199, 0.2));
 }}
 
+/*------------- 评论清理页面的标题、获取进度和日志 ---------------------- */
+QLabel#commentCleanTitle {{
+    font-size: 18px;
+    font-weight: bold;
+    color: #ecf0f1;
+}}
+
+QLabel#fetchActivityLabel {{
+    color: #7FB3D3;
+    margin-top: 10px;
+}}
+
+QTextEdit#logDisplay {{
+    background-color: rgba(30, 41, 59, 0.8);
+    border: 1px solid #475569;
+    border-radius: 8px;
+    color: #e2e8f0;
+    font-family: Consolas, Monaco, monospace;
+    font-size: 12px;
+    padding: 5px;
+}}
+
 /*----------------- 评论详情页面的评论内容样式 - B站来源 ---------------*/
 QTextEdit#bilibiliCommentContent {{
     background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
@@ -797,6 +819,36 @@ QFrame#bottomControlFrame {{
     box-shadow: 0 4px 12px rgba(236, 72, 153, 0.2);
 }}
 
+QLabel#messageManagerTitle {{
+    font-size: 18px;
+    font-weight: bold;
+    color: #ecf0f1;
+}}
+
+QLabel#messageLimitLabel {{
+    color: #ecf0f1;
+    font-size: 18px;
+}}
+
+QLabel#messageSectionLabel {{
+    font-weight: bold;
+    color: #ecf0f1;
+    padding: 5px;
+}}
+
+QLineEdit#messageLimitInput {{
+    background-color: #34495e;
+    color: white;
+    border: 1px solid #7f8c8d;
+    padding: 6px;
+    border-radius: 12px;
+    font-size: 12px;
+}}
+
+QLineEdit#messageLimitInput:focus {{
+    border: 1px solid #3498db;
+}}
+
 /* =================================================== 数据统计页面专用样式 ============================================= */
 
 
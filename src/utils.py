@@ -1,7 +1,9 @@
 
 import logging
 import random
-from typing import Optional
+import re
+from functools import lru_cache
+from typing import Optional, List
 from .api.api_service import ApiService
 
 logger = logging.getLogger(__name__)
@@ -18,21 +20,19 @@ async def get_cid(api_service: ApiService, av: int) -> Optional[int]:#从AV号
         logger.error(f"Failed to get CID for av{av}: {e}")
         return None
 
-def normalize_string(s: str) -> str:
-    full_to_half_map = {i: i - 65248 for i in range(65281, 65375)}
-    full_to_half_map[12288] = 32  # 转换全角空格
-
-    return s.translate(full_to_half_map)
+# 全角转半角映射表，模块加载时构建一次
+_FULL_TO_HALF_MAP = {i: i - 65248 for i in range(65281, 65375)}
+_FULL_TO_HALF_MAP[12288] = 32  # 转换全角空格
 
-def fuzzy_search(search_query: str, text: str) -> bool:
+def normalize_string(s: str) -> str:
+    return s.translate(_FULL_TO_HALF_MAP)
 
-    # 标准化
-    search_query_norm = normalize_string(search_query)
-    text_norm = normalize_string(text)
-    # 统一转为小写以实现不区分大小写的搜索
-    search_query_norm = search_query_norm.lower()
-    text_norm = text_norm.lower()
+def normalize_for_search(s: str) -> str:
+    """搜索用的标准化文本，可提前算好后配合 preprocessed=True 使用"""
+    # 标准化并统一转为小写以实现不区分大小写的搜索
+    return normalize_string(s).lower()
 
+def _subsequence_match(search_query_norm: str, text_norm: str) -> bool:
     last_index = -1
     for char in search_query_norm:
         # 从上一个字符找到的位置之后开始查找当前字符
@@ -48,6 +48,38 @@ def fuzzy_search(search_query: str, text: str) -> bool:
     # 所有字符都按顺序找到了
     return True
 
+@lru_cache(maxsize=64)
+def _compile_subsequence(search_query_norm: str):
+    """把子序列匹配编译为正则，逐字符用 [^x]*x 跳到下一次出现，整段扫描在C层完成。
+    [^x]* 只能停在第一个 x 之前，不会回溯出别的匹配，因此无需占有量词（3.11 才支持）"""
+    parts = []
+    for char in search_query_norm:
+        escaped = re.escape(char)
+        parts.append(f"[^{escaped}]*{escaped}")
+    return re.compile("".join(parts), re.DOTALL).match
+
+def fuzzy_search(search_query: str, text: str, preprocessed: bool = False) -> bool:
+    """preprocessed=True 表示 text 已经过 normalize_for_search"""
+    if not preprocessed:
+        text = normalize_for_search(text)
+    return _subsequence_match(normalize_for_search(search_query), text)
+
+def fuzzy_filter(search_query: str, texts: List[str], preprocessed: bool = False) -> List[int]:
+    """对一批文本执行 fuzzy_search，查询只标准化、编译一次，返回匹配文本的下标
+
+    preprocessed=True 表示 texts 已经过 normalize_for_search，不再逐条标准化
+    """
+    search_query_norm = normalize_for_search(search_query)
+    if not search_query_norm:
+        return list(range(len(texts)))
+    match = _compile_subsequence(search_query_norm)
+    if preprocessed:
+        return [i for i, text in enumerate(texts) if match(text)]
+    return [
+        i for i, text in enumerate(texts)
+        if match(normalize_for_search(text))
+    ]
+
 
 class ClickTracker:
     def __init__(self, target_clicks: int):